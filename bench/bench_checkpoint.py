@@ -0,0 +1,78 @@
+import argparse, gzip, json, os, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from subcrawler.checkpoint import CrawlCheckpoint
+from subcrawler.dedup import Deduper
+from subcrawler.seenset import make_seen_set
+
+# 체크포인트 한 번 저장하는 데 걸리는 시간 (reactor가 멈추는 시간)과 파일 크기
+#   legacy: 예전 방식, 매번 frontier + 본문 fingerprint + Bloom filter 전체를 gzip JSON으로
+#   sqlite: CrawlCheckpoint, 바뀐 frontier / fingerprint / 필터만 쓰고 커밋
+# 이미 N페이지를 크롤링한 상태에서 저장 간격마다 --per-interval 페이지씩 더 받는다고 가정
+class Request:
+    def __init__(self, url, depth):
+        self.url = url
+        self.meta = {'subdomain': 'bench.test', 'depth': depth}
+
+def url(i):
+    return f"https://sub{i % 5000}.bench.test/page/{i}?id={i * 7919}"
+
+def crawl(checkpoint, dedup, start, count, frontier):
+    for i in range(start, start + count):
+        checkpoint.track(Request(url(i + frontier), 2), None)
+        dedup.seen_url(url(i + frontier))
+        checkpoint.complete(Request(url(i), 2))
+        dedup.duplicate_of(url(i), url(i).encode())
+
+def legacy_save(path, dedup, frontier):
+    state = {'subdomains': [], 'enumerating': False, 'dedup': dedup.state(),
+             'frontier': {url: {'subdomain': 'bench.test', 'depth': 2} for url in frontier}}
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(state, f, separators=(',', ':'))
+
+def timed(save):
+    start = time.perf_counter()
+    save()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=1000000, help="이미 크롤링한 페이지 수")
+    parser.add_argument('--frontier', type=int, default=100000, help="남은 요청 수")
+    parser.add_argument('--per-interval', type=int, default=3000, help="저장 간격(30초) 동안 더 받는 페이지 수")
+    parser.add_argument('--saves', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # legacy: 메모리 dict + Bloom filter를 통째로
+        dedup = Deduper(make_seen_set('bloom'))
+        for i in range(args.pages):
+            dedup.seen_url(url(i))
+            dedup.duplicate_of(url(i), url(i).encode())
+        frontier = [url(args.pages + i) for i in range(args.frontier)]
+        path = os.path.join(tmp, 'legacy.checkpoint.json.gz')
+        legacy = [timed(lambda: legacy_save(path, dedup, frontier)) for _ in range(args.saves)]
+        legacy_size = os.path.getsize(path)
+
+        # sqlite: 같은 상태를 한 번 만들어 두고, 간격마다 per-interval 페이지씩 진행하며 저장
+        checkpoint = CrawlCheckpoint(os.path.join(tmp, 'bench.checkpoint.sqlite3'), meta_keys=('subdomain', 'depth')).open(reset=True)
+        dedup = Deduper(make_seen_set('bloom'), pages=checkpoint.pages)
+        crawl(checkpoint, dedup, 0, args.pages, args.frontier)
+        checkpoint.save({'dedup': dedup.state(checkpoint)})
+        done = args.pages
+        incremental = []
+        for _ in range(args.saves):
+            crawl(checkpoint, dedup, done, args.per_interval, args.frontier)
+            done += args.per_interval
+            incremental.append(timed(lambda: checkpoint.save({'dedup': dedup.state(checkpoint)})))
+        checkpoint.close()
+        sqlite_size = sum(os.path.getsize(checkpoint.path + suffix) for suffix in ('', '-wal')
+                          if os.path.exists(checkpoint.path + suffix))
+
+    print(f"{args.pages} pages crawled, {args.frontier} pending, {args.per_interval} new pages per interval")
+    print(f"{'legacy':>7}: {min(legacy) * 1000:8.1f} ms per save, file {legacy_size / 2**20:6.1f} MiB")
+    print(f"{'sqlite':>7}: {min(incremental) * 1000:8.1f} ms per save, file {sqlite_size / 2**20:6.1f} MiB")
+
+if __name__ == "__main__":
+    main()
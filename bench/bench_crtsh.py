@@ -0,0 +1,88 @@
+import argparse, json, os, random, sys, tempfile, time, tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from subcrawler.crtsh import CHUNK_SIZE, parse_chunks
+from subcrawler.scope import normalize_host
+
+# crt.sh 응답 전체를 json.loads 하던 방식 vs 청크 스트리밍 파싱 (시간, tracemalloc peak)
+# 픽스처는 crt.sh output=json 형식으로 생성: 인증서마다 여러 줄 name_value, 와일드카드, 대소문자, 중복이 많음
+def make_fixture(path, rows, unique, domain, seed=1):
+    rng = random.Random(seed)
+    names = [f"{rng.choice(['api', 'dev', 'mail', 'vpn', 'cdn', 'app'])}{i}.{domain}" for i in range(unique)]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i in range(rows):
+            san = rng.sample(names, k=rng.randint(1, 4))
+            if rng.random() < 0.3:
+                san.append(f"*.{rng.choice(names)}")
+            if rng.random() < 0.1:
+                san.append(rng.choice(names).upper())
+            f.write(',' if i else '')
+            json.dump({
+                'issuer_ca_id': 183267,
+                'issuer_name': "C=US, O=Let's Encrypt, CN=R3",
+                'common_name': san[0],
+                'name_value': '\n'.join(san),
+                'id': 9000000000 + i,
+                'entry_timestamp': '2024-03-01T12:00:00.000',
+                'not_before': '2024-03-01T11:00:00',
+                'not_after': '2024-05-30T11:00:00',
+                'serial_number': f"{rng.getrandbits(128):032x}",
+                'result_count': len(san),
+            }, f, separators=(',', ':'))
+        f.write(']')
+
+# 기존 get_crtsh: response.json()으로 본문 전체를 한 번에 파싱
+def legacy(path, domain):
+    with open(path, 'rb') as f:
+        data = json.loads(f.read())
+    hosts = set()
+    for item in data:
+        for name in item['name_value'].split('\n'):
+            host = normalize_host(name, domain)
+            if host:
+                hosts.add(host)
+    return hosts
+
+def streaming(path, domain):
+    with open(path, 'rb') as f:
+        return set(parse_chunks(iter(lambda: f.read(CHUNK_SIZE), b''), domain))
+
+def measure(func, path, domain):
+    start = time.perf_counter()
+    hosts = func(path, domain)
+    elapsed = time.perf_counter() - start
+    # tracemalloc은 느려지므로 메모리는 따로 한 번 더 돌려서 잰다
+    tracemalloc.start()
+    func(path, domain)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return hosts, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=300000, help="인증서(JSON 항목) 수")
+    parser.add_argument('--unique', type=int, default=5000, help="고유 호스트 수")
+    parser.add_argument('--fixture', help="기존 crt.sh 응답 파일 (없으면 생성)")
+    parser.add_argument('--domain', default='example.com')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.fixture
+        if not path:
+            path = os.path.join(tmp, 'crtsh.json')
+            make_fixture(path, args.rows, args.unique, args.domain)
+        size = os.path.getsize(path)
+        print(f"fixture: {size / 2**20:.1f} MiB")
+        results = {}
+        for name, func in (('json.loads', legacy), ('streaming', streaming)):
+            hosts, elapsed, peak = measure(func, path, args.domain)
+            results[name] = hosts
+            print(f"{name:>11}: {len(hosts)} hosts in {elapsed:.2f}s ({size / 2**20 / elapsed:.1f} MiB/s), "
+                  f"peak {peak / 2**20:.1f} MiB")
+        if results['json.loads'] != results['streaming']:
+            print("host sets DIFFER")
+
+if __name__ == "__main__":
+    main()
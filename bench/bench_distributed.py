@@ -0,0 +1,62 @@
+import argparse, json, os, subprocess, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from sitefarm import SiteFarm
+from subcrawler.plugins import enumerator
+
+# 분산 모드(--workers N) 처리량: 같은 가상 사이트를 worker 수만 바꿔서 크롤링
+# 이 모듈 자체가 --plugin 으로 불려서 'farm' enumerator(BENCH_HOSTS의 호스트)를 등록한다
+@enumerator('farm')
+async def farm_source(domain):
+    for host in os.environ['BENCH_HOSTS'].split(','):
+        yield host
+
+def crawl(workers, depth):
+    from subcrawler.cli import main
+    start = time.perf_counter()
+    main(['bench.test', str(depth), '--sources', 'farm', '--plugin', 'bench_distributed', '--no-probe',
+          '--schemes', 'http', '--workers', str(workers), '--set', 'DOWNLOAD_DELAY=0', '--set', 'LOG_LEVEL="ERROR"',
+          '--set', 'CONCURRENT_REQUESTS_PER_DOMAIN=8'] + os.environ.get('BENCH_ARGS', '').split(), preset='only_crt')
+    elapsed = time.perf_counter() - start
+    with open('bench.test_analysis.json') as f:
+        pages = sum(len(entry['pages']) for entry in json.load(f).values())
+    return {'pages': pages, 'seconds': elapsed}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subdomains', type=int, default=16)
+    parser.add_argument('--pages', type=int, default=100, help="호스트당 페이지 수")
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--workers', default='1,2,4', help="비교할 worker 수, 쉼표로 구분")
+    parser.add_argument('--run', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        # 하위 프로세스: 결과 JSON 한 줄만 출력 (요약 등 다른 출력은 stderr로)
+        stdout, sys.stdout = sys.stdout, sys.stderr
+        result = crawl(args.run, args.depth)
+        print(json.dumps(result), file=stdout)
+        return
+
+    hosts = [f"s{i}.bench.test" for i in range(args.subdomains)]
+    print(f"{len(hosts)} subdomains x {args.pages} pages, {os.cpu_count()} CPUs")
+    base = None
+    for workers in [int(n) for n in args.workers.split(',')]:
+        farm = SiteFarm(latency=args.latency, pages=args.pages, links=3).start()
+        env = dict(os.environ, http_proxy=farm.url, BENCH_HOSTS=','.join(hosts),
+                   PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.abspath(__file__)), ROOT]))
+        env.pop('no_proxy', None)
+        with tempfile.TemporaryDirectory() as tmp:
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--run', str(workers)] + sys.argv[1:],
+                                    env=env, cwd=tmp, capture_output=True, text=True, check=True).stdout
+        farm.stop()
+        result = json.loads(output.strip().splitlines()[-1])
+        rate = result['pages'] / result['seconds']
+        base = base or rate
+        print(f"{workers:>3} workers: {result['pages']} pages in {result['seconds']:.2f}s "
+              f"({rate:.1f} pages/sec, x{rate / base:.2f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse, json, os, random, socket, subprocess, sys, tempfile, threading, time
+import dns.message, dns.rcode, dns.rrset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from sitefarm import SiteFarm
+from subcrawler.metrics import Histogram, LATENCY_BUCKETS
+
+# 진입 스크립트(amas.py / crtns.py / only_crt.py / bs4/sub.py)를 실제 프로세스로 실행해서 비교
+# 외부 의존 없이 재현되도록: 가상 사이트(sitefarm, HTTP 프록시), crt.sh 응답(/crt.sh/ 경로), 가짜 amass 실행 파일,
+# wordlist용 DNS 서버를 로컬에서 띄운다
+# 결과: 페이지 수, pages/sec, 요청 지연 p50/p99(--metrics-out의 fetch_seconds), 최대 RSS, CPU 시간(user+sys)
+DOMAIN = 'bench.test'
+ENTRY_POINTS = {
+    'amas': ['amas.py'],
+    'crtns': ['crtns.py'],
+    'only_crt': ['only_crt.py'],
+    'sub': ['bs4/sub.py'],
+    'sub-async': ['bs4/sub.py', '--async'],
+}
+
+# crt.sh output=json 형식: 인증서마다 여러 줄 name_value, 와일드카드, 대문자, 범위 밖 이름이 섞여 있다
+def crtsh_fixture(hosts, seed=1):
+    rng = random.Random(seed)
+    rows = []
+    for i, host in enumerate(hosts):
+        names = [host, rng.choice(hosts)]
+        if rng.random() < 0.3:
+            names.append(f"*.{host}")
+        if rng.random() < 0.1:
+            names.append(host.upper())
+        if rng.random() < 0.1:
+            names.append(f"{host.split('.')[0]}.evil{DOMAIN}")
+        rows.append({'issuer_name': "C=US, O=Let's Encrypt, CN=R3", 'common_name': host, 'name_value': '\n'.join(names),
+                     'id': 9000000000 + i, 'not_before': '2024-03-01T11:00:00', 'not_after': '2024-05-30T11:00:00'})
+    return json.dumps(rows).encode()
+
+# amass는 crt.sh와 일부만 겹치는 이름을 한 줄에 하나씩 출력
+def amass_stub(path, hosts):
+    with open(path, 'w') as f:
+        f.write(f"#!{sys.executable}\n")
+        f.write(f"print({chr(10).join(hosts[::2])!r})\n")
+    os.chmod(path, 0o755)
+
+# 주어진 이름만 127.0.0.1로 답하고 나머지는 NXDOMAIN (wildcard 확인용 무작위 이름 포함)
+def dns_stub(hosts):
+    names = set(hosts)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+
+    def serve():
+        while True:
+            data, addr = sock.recvfrom(4096)
+            query = dns.message.from_wire(data)
+            response = dns.message.make_response(query)
+            question = query.question[0]
+            if question.name.to_text().rstrip('.') not in names:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            elif question.rdtype == 1:
+                response.answer.append(dns.rrset.from_text(question.name, 60, 'IN', 'A', '127.0.0.1'))
+            sock.sendto(response.to_wire(), addr)
+
+    threading.Thread(target=serve, daemon=True).start()
+    return f"127.0.0.1:{sock.getsockname()[1]}"
+
+# OpenMetrics 텍스트에서 fetch_seconds 히스토그램을 다시 합친다 (엔진 라벨 무관)
+def fetch_latency(path):
+    hist = Histogram()
+    bounds = [str(float(bound)) for bound in LATENCY_BUCKETS] + ['+Inf']
+    cumulative = {}
+    with open(path) as f:
+        for line in f:
+            if not line.startswith('subcrawler_fetch_seconds_bucket{'):
+                continue
+            labels, value = line.rsplit(' ', 1)
+            le = labels.rsplit('le="', 1)[1].rstrip('"}')
+            le = le if le == '+Inf' else str(float(le))
+            series = labels.split('le="')[0]
+            cumulative.setdefault(series, {})[le] = int(value)
+    for series in cumulative.values():
+        previous = 0
+        for i, bound in enumerate(bounds):
+            count = series.get(bound, previous)
+            hist.counts[i] += count - previous
+            hist.count += count - previous
+            previous = count
+    return hist
+
+def run(name, args, env, tmp):
+    script, *extra = ENTRY_POINTS[name]
+    metrics = os.path.join(tmp, f"{name}.prom")
+    command = [sys.executable, os.path.join(ROOT, script), DOMAIN, str(args.depth), '--plugin', 'stubs', '--refresh',
+               '--metrics-out', metrics, '--set', 'DOWNLOAD_DELAY=0', '--set', 'LOG_LEVEL="ERROR"'] + extra
+    if name == 'crtns':
+        command += ['--wordlist', env['BENCH_WORDLIST'], '--nameservers', env['BENCH_DNS']]
+    command += args.args.split()
+    with open(os.path.join(tmp, f"{name}.log"), 'w') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, env=env, cwd=tmp, stdout=log, stderr=subprocess.STDOUT)
+        # wait4: 이 프로세스(와 기다린 자식 프로세스)만의 rusage
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise SystemExit(f"{name} exited with {process.returncode}, see {log.name}")
+    with open(os.path.join(tmp, f"{DOMAIN}_analysis.json")) as f:
+        data = json.load(f)
+    pages = sum(len(entry['pages']) if isinstance(entry, dict) else len(entry) for entry in data.values())
+    return {'pages': pages, 'seconds': elapsed, 'latency': fetch_latency(metrics),
+            'rss': usage.ru_maxrss * 1024, 'cpu': usage.ru_utime + usage.ru_stime}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subdomains', type=int, default=500)
+    parser.add_argument('--pages', type=int, default=20, help="호스트당 페이지 수")
+    parser.add_argument('--links', type=int, default=3, help="페이지당 같은 호스트 링크 수")
+    parser.add_argument('--peers', type=int, default=20, help="다른 호스트로 가는 링크 대상 호스트 수")
+    parser.add_argument('--forms', type=int, default=4, help="페이지마다 더 붙는 폼 수")
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--scripts', default=','.join(ENTRY_POINTS), help="실행할 진입점, 쉼표로 구분")
+    parser.add_argument('--args', default='', help="모든 실행에 덧붙일 CLI 옵션, 예: '--no-probe --sink jsonl'")
+    args = parser.parse_args()
+
+    hosts = [f"s{i}.{DOMAIN}" for i in range(args.subdomains)]
+    print(f"{len(hosts)} subdomains x {args.pages} pages, depth {args.depth}, {args.forms + 2} forms/page, "
+          f"latency {args.latency * 1000:.0f} ms, {os.cpu_count()} CPUs")
+    crtsh = crtsh_fixture(hosts)
+    print(f"{'entry point':<12}{'pages':>8}{'seconds':>9}{'pages/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'RSS MiB':>9}{'CPU s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.mkdir(os.path.join(tmp, 'bin'))
+        amass_stub(os.path.join(tmp, 'bin', 'amass'), hosts)
+        wordlist = os.path.join(tmp, 'wordlist.txt')
+        with open(wordlist, 'w') as f:
+            f.write('\n'.join([host.split('.')[0] for host in hosts[1::3]] + [f"missing{i}" for i in range(len(hosts) // 3)]))
+        base_env = dict(os.environ, BENCH_WORDLIST=wordlist, BENCH_DNS=dns_stub(hosts),
+                        PATH=os.pathsep.join([os.path.join(tmp, 'bin'), os.environ.get('PATH', '')]),
+                        PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.abspath(__file__)), ROOT]))
+        base_env.pop('no_proxy', None)
+        for name in args.scripts.split(','):
+            farm = SiteFarm(latency=args.latency, pages=args.pages, links=args.links, peers=hosts[:args.peers],
+                            forms=args.forms, routes={'/crt.sh/': (crtsh, 'application/json')}).start()
+            env = dict(base_env, http_proxy=farm.url, BENCH_CRTSH=farm.url)
+            workdir = os.path.join(tmp, name)
+            os.mkdir(workdir)
+            result = run(name, args, env, workdir)
+            farm.stop()
+            latency = result['latency']
+            print(f"{name:<12}{result['pages']:>8}{result['seconds']:>9.1f}{result['pages'] / result['seconds']:>9.1f}"
+                  f"{latency.quantile(0.5) * 1000:>9.1f}{latency.quantile(0.99) * 1000:>9.1f}"
+                  f"{result['rss'] / 2**20:>9.0f}{result['cpu']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
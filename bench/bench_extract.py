@@ -0,0 +1,76 @@
+import argparse, glob, os, sys, time, warnings
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from subcrawler.extract import analyze_html
+
+warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BASE_URL = 'https://www.bench.test/'
+
+# 기존 bs4/sub.py 방식 (html.parser, find_all 두 번)
+def legacy_analyze(content, base_url, encoding=None):
+    soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+    input_tags = []
+    for tag in soup.find_all(['input', 'textarea', 'select']):
+        if tag.name == 'input' and tag.get('type') in ['button', 'submit', 'reset']:
+            continue
+        input_tags.append(str(tag))
+    form_data = {}
+    for tag in soup.find_all(['input', 'textarea', 'select']):
+        if tag.get('name'):
+            if tag.name == 'select':
+                options = tag.find_all('option')
+                form_data[tag['name']] = options[0].get('value', '') if options else ''
+            else:
+                form_data[tag['name']] = tag.get('value', 'test_value')
+    csrf_token = None
+    csrf_meta = soup.find('meta', attrs={'name': 'csrf-token'})
+    if csrf_meta:
+        csrf_token = csrf_meta.get('content')
+        form_data['csrf_token'] = csrf_token
+    links = [urljoin(base_url, a['href']) for a in soup.find_all('a', href=True)]
+    return {'input_tags': input_tags, 'form_data': form_data, 'csrf_token': csrf_token, 'links': links}
+
+def _analyze(content):
+    return analyze_html(content, BASE_URL, 'utf-8')
+
+def load_corpus():
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, '*.html'))):
+        with open(path, 'rb') as f:
+            corpus[os.path.basename(path)] = f.read()
+    return corpus
+
+def measure(name, pages, run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{name:>14}: {pages / elapsed:8.1f} pages/sec")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=50, help="코퍼스 반복 횟수")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    for name, content in corpus.items():
+        legacy, new = legacy_analyze(content, BASE_URL, 'utf-8'), _analyze(content)
+        differs = [key for key in legacy if legacy[key] != new[key]]
+        print(f"{name:>20}: {len(content):7d} bytes, output {'differs in ' + ', '.join(differs) if differs else 'identical'}")
+
+    documents = list(corpus.values()) * args.repeat
+    pages = len(documents)
+    print(f"\n{pages} pages")
+    measure('bs4 html.parser', pages, lambda: [legacy_analyze(doc, BASE_URL, 'utf-8') for doc in documents])
+    measure('lxml', pages, lambda: [_analyze(doc) for doc in documents])
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(_analyze, documents[:args.workers]))  # 워커 프로세스 미리 띄우기
+        measure(f'lxml x{args.workers} proc', pages, lambda: list(pool.map(_analyze, documents, chunksize=8)))
+
+if __name__ == "__main__":
+    main()
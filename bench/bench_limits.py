@@ -0,0 +1,68 @@
+import argparse, json, os, subprocess, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from sitefarm import SiteFarm
+from subcrawler.plugins import enumerator
+
+# 응답 크기 제한: 페이지마다 큰 바이너리 링크, 10페이지 중 하나는 아주 큰 HTML인 가상 사이트를
+# 엔진별로 --all-types --max-bytes 0 (예전처럼 모두 받기) / 기본값(HTML만, --max-bytes까지)으로 크롤링
+# 가상 사이트가 실제로 보낸 바이트, 최대 RSS, 페이지 수, 시간
+# 이 모듈 자체가 --plugin 으로 불려서 'farm' enumerator(BENCH_HOSTS의 호스트)를 등록한다
+@enumerator('farm')
+async def farm_source(domain):
+    for host in os.environ['BENCH_HOSTS'].split(','):
+        yield host
+
+MODES = {
+    'unlimited': ['--all-types', '--max-bytes', '0'],
+    'limited': [],
+}
+
+def run(engine, mode, args, env, tmp):
+    command = [sys.executable, '-m', 'subcrawler', 'bench.test', str(args.depth), '--sources', 'farm',
+               '--plugin', 'bench_limits', '--no-probe', '--schemes', 'http', '--engine', engine, '--refresh',
+               '--form-concurrency', '0', '--set', 'DOWNLOAD_DELAY=0', '--set', 'LOG_LEVEL="INFO"'] + MODES[mode]
+    if mode == 'limited':
+        command += ['--max-bytes', str(args.max_bytes)]
+    with open(os.path.join(tmp, f"{engine}-{mode}.log"), 'w') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, env=env, cwd=tmp, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+    if os.waitstatus_to_exitcode(status):
+        raise SystemExit(f"{engine} {mode} failed, see {log.name}")
+    with open(os.path.join(tmp, 'bench.test_analysis.json')) as f:
+        pages = sum(len(entry['pages']) if isinstance(entry, dict) else len(entry) for entry in json.load(f).values())
+    with open(log.name) as f:
+        summary = next((line.split('Size limits: ', 1)[1].strip() for line in f if 'Size limits: ' in line), '')
+    return pages, elapsed, usage.ru_maxrss * 1024, summary
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subdomains', type=int, default=10)
+    parser.add_argument('--pages', type=int, default=30, help="호스트당 페이지 수")
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--file-size', type=int, default=8 * 2**20, help="페이지마다 링크된 바이너리 크기")
+    parser.add_argument('--huge', type=int, default=6 * 2**20, help="10페이지 중 하나에 더 붙는 HTML 크기")
+    parser.add_argument('--max-bytes', type=int, default=2 * 2**20)
+    parser.add_argument('--engines', default='scrapy,sync,async')
+    args = parser.parse_args()
+
+    hosts = [f"s{i}.bench.test" for i in range(args.subdomains)]
+    print(f"{len(hosts)} subdomains x {args.pages} pages, {args.file_size / 2**20:.0f} MiB file per page, "
+          f"{args.huge / 2**20:.0f} MiB extra HTML on every 10th page, --max-bytes {args.max_bytes}")
+    for engine in args.engines.split(','):
+        for mode in MODES:
+            farm = SiteFarm(pages=args.pages, links=3, files=args.file_size, huge=args.huge).start()
+            env = dict(os.environ, http_proxy=farm.url, BENCH_HOSTS=','.join(hosts),
+                       PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.abspath(__file__)), ROOT]))
+            env.pop('no_proxy', None)
+            with tempfile.TemporaryDirectory() as tmp:
+                pages, elapsed, rss, summary = run(engine, mode, args, env, tmp)
+            farm.stop()
+            print(f"{engine:>7} {mode:>10}: {pages:5} pages in {elapsed:6.1f}s, {farm.sent_bytes / 2**20:8.1f} MiB sent, "
+                  f"peak RSS {rss / 2**20:5.0f} MiB  {summary}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse, glob, os, statistics, sys, time, tracemalloc
+from scrapy.http import HtmlResponse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from subcrawler.extract import extract_page_data
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 기존 스파이더의 extract_page_data (XPath 여러 번)
+def legacy_extract_page_data(response):
+    input_tags = []
+    for tag in response.xpath('//input|//textarea|//select'):
+        input_tags.append({
+            'type': tag.attrib.get('type', 'text'),
+            'name': tag.attrib.get('name', ''),
+            'id': tag.attrib.get('id', ''),
+            'value': tag.attrib.get('value', '')
+        })
+    csrf_token = response.xpath('//meta[@name="csrf-token"]/@content').get()
+    form_data = {}
+    for form in response.xpath('//form'):
+        form_data[form.attrib.get('id', '')] = {
+            'action': form.attrib.get('action', ''),
+            'method': form.attrib.get('method', 'get'),
+            'inputs': [
+                {'name': input.attrib.get('name', ''), 'value': input.attrib.get('value', 'test_value')}
+                for input in form.xpath('.//input|.//textarea|.//select')
+                if 'name' in input.attrib
+            ]
+        }
+    cookies = [cookie.decode() for cookie in response.headers.getlist('Set-Cookie')]
+    return {'url': response.url, 'input_tags': input_tags, 'csrf_token': csrf_token,
+            'form_data': form_data, 'cookies': cookies}
+
+def make_response(path):
+    with open(path, 'rb') as f:
+        body = f.read()
+    response = HtmlResponse(url=f"https://www.bench.test/{os.path.basename(path)}", body=body,
+                            headers={'Set-Cookie': 'session=bench'}, encoding='utf-8')
+    response.selector  # 파싱은 두 방식 공통이므로 측정에서 제외
+    return response
+
+def latency_us(func, response, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(response)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+def allocations(func, response):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func(response)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    del result
+    return blocks, peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'fixture':>20} {'impl':>8} {'median us':>10} {'alloc blocks':>13} {'peak KiB':>9}")
+    for path in sorted(glob.glob(os.path.join(FIXTURES, '*.html'))):
+        response = make_response(path)
+        name = os.path.basename(path)
+        if legacy_extract_page_data(response) != extract_page_data(response):
+            print(f"{name:>20} output DIFFERS")
+        for impl, func in (('xpath', legacy_extract_page_data), ('onepass', extract_page_data)):
+            blocks, peak = allocations(func, response)
+            print(f"{name:>20} {impl:>8} {latency_us(func, response, args.repeat):10.1f} {blocks:13d} {peak / 1024:9.1f}")
+
+if __name__ == "__main__":
+    main()
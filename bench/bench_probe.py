@@ -0,0 +1,150 @@
+import argparse, asyncio, datetime, os, socket, ssl, sys, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from sitefarm import _Server
+from subcrawler.probe import Prober
+
+# Prober(ports=...)를 로컬 plain / 자체 서명 HTTPS 서버로 확인
+# 호스트마다 다른 루프백 주소(127.0.0.N)에 서버를 띄운다 (포트는 scheme마다 하나라서 주소로 구분)
+#   both       : http, https 모두 200 -> https 우선
+#   http-only  : https 없음 -> http
+#   upgrade    : http가 https-only 호스트로 301 -> 리다이렉트 뒤 https origin
+#   alias      : http가 both의 https로 301 -> 같은 origin이라 버림 (중복 origin)
+#   head-405   : HEAD를 막고 GET만 받음 -> GET으로 다시 확인
+#   dead       : 아무것도 듣지 않음 -> 버림
+# --dead N: 죽은 호스트를 더 섞어서 전체 probe 시간을 본다
+HOSTS = {
+    'both': '127.0.0.2',
+    'http-only': '127.0.0.3',
+    'upgrade': '127.0.0.4',
+    'https-target': '127.0.0.5',
+    'alias': '127.0.0.6',
+    'head-405': '127.0.0.7',
+    'dead': '127.0.0.9',
+}
+
+def self_signed(tmp):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'bench.test')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number()).not_valid_before(now)
+            .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256()))
+    cert_path, key_path = os.path.join(tmp, 'cert.pem'), os.path.join(tmp, 'key.pem')
+    with open(cert_path, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return cert_path, key_path
+
+# location: 주면 모든 요청을 거기로 301, head_allowed=False면 HEAD에 405
+def handler(location=None, head_allowed=True):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def respond(self, status, body=b''):
+            self.send_response(status)
+            if location:
+                self.send_header('Location', location)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def do_HEAD(self):
+            if not head_allowed:
+                return self.respond(405)
+            self.respond(301 if location else 200)
+
+        def do_GET(self):
+            self.respond(301 if location else 200, b'<html>ok</html>')
+
+    return Handler
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def serve(address, port, handler_class, context=None):
+    server = _Server((address, port), handler_class)
+    if context is not None:
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dead', type=int, default=50, help="더 섞을 죽은 호스트 수 (127.0.1.N)")
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--connect-timeout', type=float, default=3)
+    args = parser.parse_args()
+    for name in ('http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY'):
+        os.environ.pop(name, None)  # Prober는 trust_env라서 프록시가 있으면 로컬 서버에 직접 가지 않는다
+
+    http_port, https_port = free_port(), free_port()
+    ports = {'http': http_port, 'https': https_port}
+    with tempfile.TemporaryDirectory() as tmp:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(*self_signed(tmp))
+    servers = [
+        serve(HOSTS['both'], http_port, handler()),
+        serve(HOSTS['both'], https_port, handler(), context),
+        serve(HOSTS['http-only'], http_port, handler()),
+        serve(HOSTS['upgrade'], http_port, handler(f"https://{HOSTS['https-target']}:{https_port}/login")),
+        serve(HOSTS['https-target'], https_port, handler(), context),
+        serve(HOSTS['alias'], http_port, handler(f"https://{HOSTS['both']}:{https_port}/")),
+        serve(HOSTS['head-405'], http_port, handler(head_allowed=False)),
+    ]
+    expected = {
+        HOSTS['both']: f"https://{HOSTS['both']}:{https_port}",
+        HOSTS['http-only']: f"http://{HOSTS['http-only']}:{http_port}",
+        HOSTS['upgrade']: f"https://{HOSTS['https-target']}:{https_port}",
+        HOSTS['head-405']: f"http://{HOSTS['head-405']}:{http_port}",
+    }
+    # both를 alias보다 먼저 확인해야 alias가 중복으로 버려진다
+    hosts = [HOSTS[name] for name in ('both', 'http-only', 'upgrade', 'head-405', 'dead')]
+    hosts += [f"127.0.1.{i}" for i in range(1, args.dead + 1)]
+
+    async def run():
+        prober = Prober(concurrency=args.concurrency, connect_timeout=args.connect_timeout, ports=ports)
+        async def stream():
+            for host in hosts:
+                yield host
+            await asyncio.sleep(0.5)  # alias는 both가 끝난 뒤에
+            yield HOSTS['alias']
+        start = time.perf_counter()
+        origins = await prober.probe_all(stream())
+        return origins, prober, time.perf_counter() - start
+
+    origins, prober, elapsed = asyncio.run(run())
+    for server in servers:
+        server.shutdown()
+
+    failures = 0
+    for name, host in HOSTS.items():
+        if name == 'https-target':
+            continue
+        got = origins.get(host)
+        ok = got == expected.get(host)
+        failures += not ok
+        print(f"{name:>10} {host:<11} -> {got or '(dropped)':<28} {'ok' if ok else 'FAIL, expected ' + str(expected.get(host))}")
+    extra = [host for host in origins if host not in expected]
+    failures += bool(extra)
+    print(f"{len(hosts) + 1} hosts ({args.dead} extra dead) probed in {elapsed:.2f}s, unexpected live: {extra or 'none'}")
+    print(prober.summary())
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse, json, os, random, subprocess, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(1, os.path.dirname(ROOT))
+from sitefarm import SiteFarm
+from subcrawler.plugins import enumerator
+
+# --incremental 재스캔: 같은 가상 사이트를 세 번 크롤링 (기준 스캔 / 바뀐 것 없음 / 일부 페이지에 form 추가)
+# 스캔마다 걸린 시간, 서버가 보낸 본문 바이트, 304 수, diff 결과를 비교한다
+@enumerator('farm')
+async def farm_source(domain):
+    for host in os.environ['BENCH_HOSTS'].split(','):
+        yield host
+
+def crawl(depth):
+    from subcrawler.cli import main
+    start = time.perf_counter()
+    main(['bench.test', str(depth), '--sources', 'farm', '--plugin', 'bench_rescan', '--no-probe', '--schemes', 'http',
+          '--incremental', '--set', 'DOWNLOAD_DELAY=0', '--set', 'LOG_LEVEL="ERROR"',
+          '--set', 'CONCURRENT_REQUESTS_PER_DOMAIN=8'], preset='only_crt')
+    return {'seconds': time.perf_counter() - start}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subdomains', type=int, default=8)
+    parser.add_argument('--pages', type=int, default=100, help="호스트당 페이지 수")
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--change', type=float, default=0.05, help="세 번째 스캔 전에 form을 추가할 페이지 비율")
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        stdout, sys.stdout = sys.stdout, sys.stderr
+        print(json.dumps(crawl(args.depth)), file=stdout)
+        return
+
+    hosts = [f"s{i}.bench.test" for i in range(args.subdomains)]
+    farm = SiteFarm(latency=args.latency, pages=args.pages, links=3, etags=True).start()
+    env = dict(os.environ, http_proxy=farm.url, BENCH_HOSTS=','.join(hosts),
+               PYTHONPATH=os.pathsep.join([ROOT, os.path.dirname(ROOT)]))
+    env.pop('no_proxy', None)
+    print(f"{len(hosts)} subdomains x {args.pages} pages, depth {args.depth}, {args.latency * 1000:.0f} ms latency")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scan in ('baseline', 'unchanged', 'changed'):
+            if scan == 'changed':
+                pages = [(host, n) for host in hosts for n in range(args.pages)]
+                farm.changed.update(random.Random(0).sample(pages, int(len(pages) * args.change)))
+            before = (farm.requests, farm.not_modified, farm.sent_bytes)
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--run'] + sys.argv[1:],
+                                    env=env, cwd=tmp, capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            requests, not_modified, sent = (now - then for now, then in
+                                            zip((farm.requests, farm.not_modified, farm.sent_bytes), before))
+            with open(os.path.join(tmp, 'bench.test_analysis.json')) as f:
+                written = sum(len(entry['pages']) for entry in json.load(f).values())
+            diff = {}
+            if os.path.exists(os.path.join(tmp, 'bench.test_diff.json')):
+                with open(os.path.join(tmp, 'bench.test_diff.json')) as f:
+                    diff = {kind: len(entries) for kind, entries in json.load(f).items()}
+            print(f"{scan:>10}: {result['seconds']:6.2f}s, {requests} requests ({not_modified} x 304), "
+                  f"{sent / 2**10:8.1f} KiB sent, {written} pages in output, diff {diff}")
+    farm.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse, os, random, re, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from subcrawler.scope import Scope
+
+DOMAIN = 'example.com'
+
+# crt.sh / 링크에서 나올 법한 이름: 대소문자, 와일드카드, 끝의 '.', 범위 밖(evilexample.com 등), IDN, 잘못된 문자
+def names(count, seed=0):
+    rng = random.Random(seed)
+    shapes = (
+        lambda i: f"host{i}.{DOMAIN}",
+        lambda i: f"*.svc{i}.API.Example.COM",
+        lambda i: f"www{i}.{DOMAIN}.",
+        lambda i: f"host{i}.evil{DOMAIN}",
+        lambda i: f"{DOMAIN}.host{i}.net",
+        lambda i: f"bücher{i}.{DOMAIN}",
+        lambda i: f"user{i}@{DOMAIN}",
+        lambda i: f"a{i}.b.c.d.{DOMAIN}",
+    )
+    return [rng.choice(shapes)(i) for i in range(count)]
+
+# 예전 bs4/sub.py: 행마다 정규식을 새로 만들고 endswith로 먼저 거른다
+def legacy_sub(names):
+    found = []
+    for name in names:
+        pattern = r'^[a-zA-Z0-9-]+(\.[a-zA-Z0-9-]+)*\.' + re.escape(DOMAIN) + '$'
+        if name.endswith(DOMAIN) and name != DOMAIN and re.match(pattern, name) is not None:
+            found.append(name)
+    return found
+
+# 예전 스파이더: endswith(domain) 만 (evilexample.com도 통과)
+def legacy_endswith(names):
+    return [name.lower().lstrip('*.') for name in names if name.lower().lstrip('*.').endswith(DOMAIN)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--names', type=int, default=300000)
+    parser.add_argument('--roots', type=int, default=1000, help="여러 루트 도메인 범위(batch 모드)를 잴 때 루트 수")
+    args = parser.parse_args()
+    data = names(args.names)
+    scope = Scope([DOMAIN])
+    many = Scope([DOMAIN] + [f"target{i}.test" for i in range(args.roots)])
+    print(f"{len(data)} names")
+    for label, run in (('legacy sub.py regex', lambda: legacy_sub(data)),
+                       ('legacy endswith', lambda: legacy_endswith(data)),
+                       ('Scope (1 root)', lambda: list(scope.filter(data))),
+                       (f'Scope ({args.roots + 1} roots)', lambda: list(many.filter(data)))):
+        start = time.perf_counter()
+        found = run()
+        elapsed = time.perf_counter() - start
+        wrong = sum(1 for name in found if 'evil' in name)
+        print(f"{label:>30}: {len(data) / elapsed:10.0f} names/sec, {len(found)} in scope, {wrong} out-of-scope accepted")
+
+    # 스파이더 링크: 예전 LinkExtractor(allow_domains=...)가 쓰던 Scrapy 함수와 비교
+    from scrapy.utils.url import url_is_from_any_domain
+    urls = [f"https://{name.lstrip('*.')}/p/{i}" for i, name in enumerate(data)]
+    for label, check in (('scrapy url_is_from_any_domain', lambda url: url_is_from_any_domain(url, [DOMAIN])),
+                         ('Scope.url_in_scope', scope.url_in_scope)):
+        start = time.perf_counter()
+        found = sum(1 for url in urls if check(url))
+        elapsed = time.perf_counter() - start
+        print(f"{label:>30}: {len(urls) / elapsed:10.0f} urls/sec, {found} in scope")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse, os, sys, tempfile, time, tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from subcrawler.seenset import make_seen_set
+
+# 가짜 URL N개를 넣은 뒤 seen-set이 차지하는 메모리, add 속도, 실제 오탐률을 비교
+def urls(count, prefix):
+    for i in range(count):
+        yield f"https://sub{i % 5000}.bench.test/{prefix}/page/{i}?id={i * 7919}"
+
+def fill(backend, count, error_rate, db_path):
+    seen = make_seen_set(backend, db_path, error_rate)
+    for url in urls(count, 'seen'):
+        seen.add(url)
+    return seen
+
+def close(seen):
+    if hasattr(seen, 'close'):
+        seen.close()
+
+def run(backend, count, error_rate, db_path):
+    # 메모리 측정 (tracemalloc 오버헤드 때문에 시간은 따로 잰다)
+    tracemalloc.start()
+    seen = fill(backend, count, error_rate, db_path)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    close(seen)
+
+    start = time.perf_counter()
+    seen = fill(backend, count, error_rate, db_path)
+    add_us = (time.perf_counter() - start) / count * 1e6
+
+    probes = max(1, count // 10)
+    start = time.perf_counter()
+    false_positives = sum(url in seen for url in urls(probes, 'unseen'))
+    lookup_us = (time.perf_counter() - start) / probes * 1e6
+    missed = sum(url not in seen for url in urls(min(count, 10000), 'seen'))
+    close(seen)
+    return memory, add_us, lookup_us, false_positives / probes, missed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--urls', type=int, default=200000)
+    parser.add_argument('--error-rate', type=float, default=0.001)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'backend':>8} {'urls':>9} {'memory MiB':>11} {'add us':>7} {'lookup us':>10} {'fp rate':>8} {'missed':>7}")
+        for backend in ('memory', 'bloom', 'sqlite'):
+            memory, add_us, lookup_us, fp_rate, missed = run(backend, args.urls, args.error_rate,
+                                                              os.path.join(tmp, 'seen.sqlite3'))
+            print(f"{backend:>8} {args.urls:9d} {memory / 2**20:11.1f} {add_us:7.2f} {lookup_us:10.2f} {fp_rate:8.4%} {missed:7d}")
+
+if __name__ == "__main__":
+    main()
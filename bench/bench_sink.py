@@ -0,0 +1,68 @@
+import argparse, json, os, sqlite3, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from subcrawler.sink import JsonSink, SqliteSink
+
+# json sink vs sqlite sink: 쓰기 시간, 파일 크기, "password 필드가 있는 폼" 조회 시간
+def record(host, n):
+    login = n % 10 == 0
+    inputs = [{'name': 'q', 'value': 'test_value'}]
+    tags = [{'type': 'text', 'name': 'q', 'id': '', 'value': ''}]
+    if login:
+        inputs += [{'name': 'username', 'value': 'test_value'}, {'name': 'password', 'value': 'test_value'}]
+        tags += [{'type': 'text', 'name': 'username', 'id': 'user', 'value': ''},
+                 {'type': 'password', 'name': 'password', 'id': 'pw', 'value': ''}]
+    return {'url': f"https://{host}/p/{n}", 'input_tags': tags, 'csrf_token': f"{host}-{n}",
+            'form_data': {f"form{n}": {'action': '/login' if login else '/search', 'method': 'post', 'inputs': inputs}},
+            'cookies': ['session=bench; Path=/']}
+
+def write(sink, hosts, pages):
+    start = time.perf_counter()
+    for host in hosts:
+        for n in range(pages):
+            sink.write(host, record(host, n))
+    sink.close()
+    return time.perf_counter() - start
+
+def query_json(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    found = set()
+    for entry in data.values():
+        for page in entry['pages']:
+            names = {tag['name'] for tag in page['input_tags'] if tag['type'] == 'password'}
+            for form in page['form_data'].values():
+                if any(i['name'] in names for i in form['inputs']):
+                    found.add((page['url'], form['action']))
+    return found
+
+def query_sqlite(path):
+    db = sqlite3.connect(path)
+    found = set(db.execute("SELECT DISTINCT url, action FROM form_inputs WHERE type = 'password'"))
+    db.close()
+    return found
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hosts', type=int, default=200)
+    parser.add_argument('--pages', type=int, default=100, help="호스트당 페이지 수")
+    args = parser.parse_args()
+    hosts = [f"s{i}.bench.test" for i in range(args.hosts)]
+    print(f"{len(hosts) * args.pages} pages")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'bench_analysis.json')
+        sqlite_path = os.path.join(tmp, 'bench_analysis.sqlite3')
+        json_seconds = write(JsonSink(os.path.join(tmp, 'bench_analysis.jsonl'), json_path), hosts, args.pages)
+        sqlite_seconds = write(SqliteSink(sqlite_path, 'bench.test'), hosts, args.pages)
+        for name, seconds, path, query in (('json', json_seconds, json_path, query_json),
+                                           ('sqlite', sqlite_seconds, sqlite_path, query_sqlite)):
+            start = time.perf_counter()
+            found = query(path)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>7}: write {seconds:6.2f}s, {os.path.getsize(path) / 2**20:6.1f} MiB, "
+                  f"password forms query {elapsed * 1000:8.1f} ms ({len(found)} forms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse, asyncio, contextlib, io, os, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from subcrawler import fetch
+from subcrawler.forms import FormProber, AsyncFormProber
+from sitefarm import SiteFarm
+
+# bs4/sub.py 순차 실행(--engine sync) vs --async 실행 처리량 비교
+def run_sync(hosts, form_concurrency, form_rate):
+    results = {}
+    forms = FormProber(form_concurrency, form_rate)
+    for host in hosts:
+        analysis = fetch.analyze_subdomain(host, scheme='http', forms=forms)
+        if analysis:
+            results[host] = analysis
+    forms.close()
+    return results
+
+def run_async(hosts, concurrency, per_host, form_concurrency, form_rate):
+    results = {}
+    async def run():
+        await fetch.analyze_all_async(hosts, results.__setitem__, concurrency, per_host, scheme='http',
+                                      forms=AsyncFormProber(form_concurrency, form_rate))
+    asyncio.run(run())
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subdomains', type=int, default=30)
+    parser.add_argument('--latency', type=float, default=0.05, help="서버 응답 지연(초)")
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--per-host', type=int, default=4)
+    parser.add_argument('--form-concurrency', type=int, default=4)
+    parser.add_argument('--form-rate', type=float, default=0, help="초당 폼 제출 수, 0이면 제한 없음")
+    args = parser.parse_args()
+
+    farm = SiteFarm(latency=args.latency).start()
+    os.environ['http_proxy'] = farm.url
+    os.environ.pop('no_proxy', None)
+    hosts = [f"s{i}.bench.test" for i in range(args.subdomains)]
+
+    for name, run in (('sync', lambda: run_sync(hosts, args.form_concurrency, args.form_rate)),
+                      ('async', lambda: run_async(hosts, args.concurrency, args.per_host, args.form_concurrency,
+                                                  args.form_rate))):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run()
+        elapsed = time.perf_counter() - start
+        pages = sum(len(analysis) for analysis in results.values())
+        print(f"{name:>6}: {pages} pages from {len(results)} subdomains in {elapsed:.2f}s "
+              f"({pages / elapsed:.1f} pages/sec)")
+    farm.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse, json, os, subprocess, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from sitefarm import SiteFarm
+
+# 전역 DOWNLOAD_DELAY vs 호스트별 HostThrottle 처리량과 429 횟수 비교
+# 일부 호스트(--limited-every 번째마다)는 초당 --rate-limit 요청만 허용하고 넘으면 429 + Retry-After
+CONFIGS = {
+    'global-delay': {
+        'CONCURRENT_REQUESTS': 32,
+        'DOWNLOAD_DELAY': 0.5,
+    },
+    'no-delay': {
+        'CONCURRENT_REQUESTS': 32,
+        'DOWNLOAD_DELAY': 0,
+    },
+    'host-throttle': {
+        'CONCURRENT_REQUESTS': 32,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 2,
+        'DOWNLOAD_DELAY': 0.5,
+        'DOWNLOADER_MIDDLEWARES': {'subcrawler.throttle.HostThrottle': 560},
+        'HOST_THROTTLE_MAX_CONCURRENCY': 8,
+        'SCHEDULER_PRIORITY_QUEUE': 'scrapy.pqueues.DownloaderAwarePriorityQueue',
+    },
+}
+
+def crawl(config, hosts):
+    import scrapy
+    from scrapy.crawler import CrawlerProcess
+
+    class FarmSpider(scrapy.Spider):
+        name = 'farm'
+        start_urls = [f"http://{host}/" for host in hosts]
+        pages = 0
+
+        def parse(self, response):
+            FarmSpider.pages += 1
+            for href in response.css('a::attr(href)').getall():
+                yield response.follow(href, callback=self.parse)
+
+    settings = dict(CONFIGS[config], LOG_LEVEL='ERROR', RETRY_TIMES=10, TELNETCONSOLE_ENABLED=False)
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(FarmSpider)
+    process.crawl(crawler)
+    start = time.perf_counter()
+    process.start()
+    elapsed = time.perf_counter() - start
+    stats = crawler.stats.get_stats()
+    return {
+        'pages': FarmSpider.pages,
+        'seconds': elapsed,
+        '429': stats.get('downloader/response_status_count/429', 0),
+        'failed': stats.get('retry/max_reached', 0),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subdomains', type=int, default=40)
+    parser.add_argument('--pages', type=int, default=20, help="호스트당 페이지 수")
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--rate-limit', type=float, default=4.0)
+    parser.add_argument('--limited-every', type=int, default=4)
+    parser.add_argument('--run', choices=sorted(CONFIGS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    hosts = [f"s{i}.bench.test" for i in range(args.subdomains)]
+
+    if args.run:
+        # Twisted reactor는 한 프로세스에서 한 번만 돌 수 있어서 설정마다 하위 프로세스로 실행
+        print(json.dumps(crawl(args.run, hosts)))
+        return
+
+    limited = {host for i, host in enumerate(hosts) if i % args.limited_every == 0}
+    print(f"{len(hosts)} subdomains x {args.pages} pages, {len(limited)} limited to {args.rate_limit}/s")
+    for config in CONFIGS:
+        farm = SiteFarm(latency=args.latency, pages=args.pages, links=3, rate_limit=args.rate_limit,
+                        limited=limited.__contains__).start()
+        env = dict(os.environ, http_proxy=farm.url)
+        env.pop('no_proxy', None)
+        output = subprocess.run([sys.executable, __file__, '--run', config] + sys.argv[1:],
+                                env=env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        farm.stop()
+        print(f"{config:>14}: {result['pages']} pages in {result['seconds']:.2f}s "
+              f"({result['pages'] / result['seconds']:.1f} pages/sec), {result['429']} x 429, "
+              f"{result['failed']} gave up")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse, asyncio, os, sys, tempfile, time, tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+from subcrawler.candidates import CandidateStream, file_labels
+
+# 워드리스트 후보: 예전 방식(파일 전체를 set으로 읽은 뒤 질의 시작) vs CandidateStream(한 줄씩, 변형 포함)
+# DNS 대신 worker가 후보를 꺼내 hit_every개마다 하나를 "찾음"으로 돌려준다 (찾은 이름은 변형을 만든다)
+# 첫 후보까지 걸린 시간과 처리량은 tracemalloc 없이, peak 메모리는 tracemalloc을 켜고 한 번 더 실행
+
+def traced(run):
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def legacy(path, domain):
+    start = time.perf_counter()
+    with open(path, 'r') as file:
+        candidates = {line.strip() + '.' + domain for line in file if line.strip()}
+    first = time.perf_counter() - start
+    count = sum(1 for _ in candidates)
+    elapsed = time.perf_counter() - start
+    return count, first, elapsed
+
+async def streamed(path, domain, permute, workers, hit_every):
+    start = time.perf_counter()
+    stream = CandidateStream(domain, file_labels(path), permute=permute)
+    first = None
+    count = 0
+
+    async def worker():
+        nonlocal first, count
+        async for host in stream:
+            first = first or time.perf_counter() - start
+            count += 1
+            await asyncio.sleep(0)  # 질의 대기 자리
+            stream.resolved(host, count % hit_every == 0)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+    return count, first, elapsed
+
+# 회귀 확인: 마지막 워드리스트 줄을 기다리는 동안(SecLists를 받는 중 등) 다른 소스가 찾은 이름이 add()되면
+# 그 변형까지 내보내고 끝나야 한다 (예전에는 pending이 남은 채 event를 기다리며 멈췄다)
+async def stalled_eof(workers=2):
+    async def labels():
+        yield 'www'
+        await asyncio.sleep(0.05)  # EOF 직전에 멈춘 다운로드
+
+    stream = CandidateStream('example.com', labels(), permute=True)
+    emitted = []
+
+    async def worker():
+        async for host in stream:
+            emitted.append(host)
+            await asyncio.sleep(0)
+            stream.resolved(host, False)
+
+    async def other_source():
+        await asyncio.sleep(0.01)
+        stream.add('api.example.com')
+
+    await asyncio.wait_for(asyncio.gather(other_source(), *(worker() for _ in range(workers))), timeout=5)
+    assert 'dev-api.example.com' in emitted, emitted
+    return len(emitted)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, default=100, help="DNS worker 수 (--dns-concurrency)")
+    parser.add_argument('--hit-every', type=int, default=5000, help="후보 몇 개마다 하나를 찾은 이름으로 볼지")
+    args = parser.parse_args()
+    domain = 'example.com'
+    print(f"stalled wordlist + add(): {asyncio.run(stalled_eof())} candidates, no hang")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'wordlist.txt')
+        with open(path, 'w') as f:
+            for i in range(args.lines):
+                f.write(f"host{i}\n")
+        print(f"{args.lines} wordlist lines, {args.workers} workers")
+        for label, run in (('legacy set', lambda: legacy(path, domain)),
+                           ('stream', lambda: asyncio.run(streamed(path, domain, False, args.workers, args.hit_every))),
+                           ('stream + permutations',
+                            lambda: asyncio.run(streamed(path, domain, True, args.workers, args.hit_every)))):
+            count, first, elapsed = run()
+            peak = traced(run)
+            print(f"{label:>22}: {count} candidates, first after {first * 1000:8.2f} ms, "
+                  f"{count / elapsed:8.0f} candidates/sec, peak {peak / 2**20:6.1f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import hashlib, sys, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+# 벤치마크용 로컬 가상 사이트 모음
+# 모든 *.bench.test 호스트를 Host 헤더로 구분해 응답하고, HTTP 프록시로도 동작한다
+# (http_proxy=farm.url 로 두면 requests / aiohttp(trust_env) / Scrapy 모두 여기로 온다)
+PAGE = """<html><head><title>{host} {n}</title><meta name="csrf-token" content="{token}"></head>
+<body>
+<form id="login{n}" action="/login" method="post">
+<input type="text" name="username"><input type="password" name="password">
+<select name="lang"><option value="ko">ko</option><option value="en">en</option></select>
+<input type="hidden" name="next" value="/p/{n}"><input type="submit" value="go">
+</form>
+<form id="search{n}" action="/search" method="get"><input type="text" name="q" value=""><textarea name="note"></textarea></form>
+{links}
+</body></html>"""
+
+# 클라이언트가 연결을 먼저 끊는 것(크롤러 종료 등)은 오류로 출력하지 않는다
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+# rate_limit: 호스트당 초당 허용 요청 수 (넘으면 429 + Retry-After), limited: 제한할 호스트 판별 함수
+# peers: 주면 페이지마다 이 호스트들 중 하나로 가는 절대 링크를 하나 더 넣는다
+# etags: ETag를 붙이고 If-None-Match가 맞으면 304, changed: 입력 필드가 하나 더 붙는 (host, n) 페이지
+# forms: 페이지마다 더 붙일 폼 수 (폼이 많은 페이지), routes: 호스트와 상관없이 고정 응답을 줄 경로 -> (본문, Content-Type)
+# files: 주면 페이지마다 이 크기의 바이너리(/download/n, application/octet-stream) 링크를 맨 앞에 넣는다
+# huge: 주면 10페이지 중 하나는 링크/폼 뒤에 이 크기의 HTML을 더 붙인다
+class SiteFarm:
+    def __init__(self, latency=0.0, pages=50, links=5, host='127.0.0.1', port=0, rate_limit=None,
+                 limited=None, retry_after=1, peers=(), etags=False, forms=0, routes=None, files=0, huge=0):
+        self.latency = latency
+        self.pages = pages
+        self.links = links
+        self.forms = forms
+        self.routes = dict(routes or {})
+        self.files = files
+        self.huge = huge
+        self.rate_limit = rate_limit
+        self.limited = limited or (lambda host: True)
+        self.retry_after = retry_after
+        self.peers = list(peers)
+        self.etags = etags
+        self.changed = set()
+        self.requests = 0
+        self.not_modified = 0
+        self.sent_bytes = 0
+        self.rejected = 0
+        self._buckets = {}  # host -> (tokens, last)
+        self._lock = threading.Lock()
+        self.server = _Server((host, port), self._handler())
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page(self, host, path):
+        n = int(path.rsplit('/', 1)[-1]) if path.rsplit('/', 1)[-1].isdigit() else 0
+        links = f'<a href="/download/{n}">download</a>\n' if self.files else ''
+        links += ''.join(f'<a href="/p/{(n * self.links + i + 1) % self.pages}">page</a>\n' for i in range(self.links))
+        if self.peers:
+            peer = self.peers[(n + len(host)) % len(self.peers)]
+            links += f'<a href="http://{peer}/p/{n}">peer</a>\n'
+        for i in range(self.forms):
+            fields = ''.join(f'<input type="text" name="field{j}">' for j in range(i % 4 + 1))
+            links += f'<form action="/submit/{i}" method="{"post" if i % 2 else "get"}">{fields}</form>\n'
+        if (host, n) in self.changed:
+            links += '<form action="/otp" method="post"><input type="text" name="otp"></form>\n'
+        if self.huge and n % 10 == 9:
+            links += '<div>' + 'x' * self.huge + '</div>\n'
+        return PAGE.format(host=host, n=n, token=f"{host}-{n}", links=links).encode()
+
+    def allow(self, host):
+        if not self.rate_limit or not self.limited(host):
+            return True
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (self.rate_limit, now))
+            tokens = min(self.rate_limit, tokens + (now - last) * self.rate_limit)
+            if tokens < 1:
+                self._buckets[host] = (tokens, now)
+                self.rejected += 1
+                return False
+            self._buckets[host] = (tokens - 1, now)
+            return True
+
+    def _handler(self):
+        farm = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def respond(self, body, content_type='text/html; charset=utf-8', head=False):
+                with farm._lock:
+                    farm.requests += 1
+                if farm.latency:
+                    time.sleep(farm.latency)
+                etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"' if farm.etags else None
+                if etag and self.headers.get('If-None-Match') == etag:
+                    with farm._lock:
+                        farm.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Set-Cookie', 'session=bench; Path=/')
+                if etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                if not head:
+                    # 클라이언트가 중간에 끊으면 거기까지만 센다
+                    for start in range(0, len(body), 65536):
+                        self.wfile.write(body[start:start + 65536])
+                        with farm._lock:
+                            farm.sent_bytes += len(body[start:start + 65536])
+
+            def target(self):
+                parts = urlsplit(self.path)
+                host = parts.hostname or self.headers.get('Host', '').split(':')[0]
+                return host, parts.path or '/'
+
+            def reject(self):
+                self.send_response(429)
+                self.send_header('Retry-After', str(farm.retry_after))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                host, path = self.target()
+                if path in farm.routes:
+                    return self.respond(*farm.routes[path])
+                if farm.files and path.startswith('/download/'):
+                    return self.respond(b'\0' * farm.files, 'application/octet-stream')
+                if not farm.allow(host):
+                    return self.reject()
+                self.respond(farm.page(host, path))
+
+            def do_HEAD(self):
+                self.respond(farm.page(*self.target()), head=True)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self.respond(b'{"ok": true}', 'application/json')
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
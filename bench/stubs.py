@@ -0,0 +1,12 @@
+import os
+from subcrawler import crtsh
+
+# bench_entrypoints.py가 --plugin stubs 로 불러오는 모듈
+# crt.sh 조회를 로컬 가상 사이트(BENCH_CRTSH)의 /crt.sh/ 경로로 돌린다 (응답 형식과 파싱은 그대로)
+# amass는 PATH 앞에 둔 가짜 실행 파일이 대신한다
+_crtsh_url = crtsh.crtsh_url
+
+def crtsh_url(domain, expired=False):
+    return _crtsh_url(domain, expired).replace('https://crt.sh/', os.environ['BENCH_CRTSH'] + '/crt.sh/', 1)
+
+crtsh.crtsh_url = crtsh_url
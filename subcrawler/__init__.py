@@ -0,0 +1,4 @@
+# 서브도메인 열거 + 크롤링 패키지
+# 실행: python -m subcrawler <domain> [max_depth] [--sources ...] [--engine scrapy|sync|async] [--sink json|jsonl]
+#       python -m subcrawler --targets targets.txt [max_depth]  (여러 도메인, subcrawler.batch)
+# 플러그인: subcrawler.plugins의 enumerator / engine / sink 데코레이터로 등록하고 --plugin <모듈>로 불러온다
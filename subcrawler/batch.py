@@ -0,0 +1,103 @@
+import os, time
+import aiohttp
+from .plugins import BATCH_ENGINES, ENGINES
+from .resolver import DnsResolver
+from .metrics import METRICS
+
+# 대상 목록 파일로 여러 도메인을 한 프로세스에서 크롤링 (--targets)
+# 한 줄에 도메인 하나, 빈 줄과 #주석은 무시, http(s):// 나 끝의 / 가 붙어 있어도 된다
+def read_targets(path):
+    domains = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            domain = line.split('#', 1)[0].strip().lower()
+            domain = domain.split('://', 1)[-1].split('/', 1)[0].rstrip('.')
+            if domain and domain not in domains:
+                domains.append(domain)
+    return domains
+
+# 끝난 도메인을 <targets>.done 에 한 줄씩 남겨서 --resume 때 건너뛴다
+# (중간에 멈춘 도메인은 각자의 체크포인트에서 이어진다)
+class BatchProgress:
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.done = set()
+        if resume and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.done = {line.strip() for line in f if line.strip()}
+        elif os.path.exists(path):
+            os.remove(path)
+        self.started = {}
+
+    def pending(self, domains):
+        return [domain for domain in domains if domain not in self.done]
+
+    def start(self, domain):
+        self.started[domain] = time.perf_counter()
+        print(f"[batch] {domain} started")
+
+    # result: finished / failed / spider가 닫힌 이유 (shutdown 등)
+    def finish(self, domain, result='finished'):
+        seconds = time.perf_counter() - self.started.pop(domain, time.perf_counter())
+        METRICS.observe('batch_domain_seconds', seconds)
+        METRICS.inc('batch_domains', result=result)
+        print(f"[batch] {domain} {result} in {seconds:.1f}s")
+        if result == 'finished':
+            self.done.add(domain)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(domain + '\n')
+
+# --global-concurrency G / --domain-concurrency P
+# -> 도메인 하나는 최대 P개 동시 요청, 동시에 도는 도메인은 G // P개 (전체 G를 넘지 않음)
+def budget(options, domains):
+    per_domain = max(1, min(options['domain_concurrency'], options['global_concurrency']))
+    parallel = max(1, options['global_concurrency'] // per_domain)
+    return min(parallel, max(1, len(domains))), per_domain
+
+# 도메인끼리 같이 쓰는 열거 자원 (이벤트 루프 안에서 만들고 닫는다)
+#   - wordlist DNS resolver: 네임서버별 rate limit과 동시 질의 수가 도메인 수와 관계없이 전체에 적용
+#   - probe 연결 풀: 전체 --concurrency 안에서 모든 도메인의 probe가 연결을 재사용
+class SharedPools:
+    def __init__(self, options):
+        self.source_options = {name: dict(values) for name, values in options['source_options'].items()}
+        if 'wordlist' in options['sources']:
+            wordlist = self.source_options.setdefault('wordlist', {})
+            wordlist['resolver'] = DnsResolver(wordlist.get('nameservers'), wordlist.get('concurrency', 100),
+                                               wordlist.get('rate', 50))
+        self.probe_connector = None
+        if options['probe']:
+            self.probe_connector = aiohttp.TCPConnector(limit=options['concurrency'], ssl=False)
+
+    async def close(self):
+        if self.probe_connector is not None:
+            await self.probe_connector.close()
+
+# batch 전용 실행기가 없는 엔진(sync, 플러그인 엔진)은 한 프로세스에서 도메인을 차례로 돌린다
+def run_sequential(domains, options, progress):
+    run = ENGINES[options['engine']]
+    for domain in domains:
+        progress.start(domain)
+        try:
+            run(domain, options)
+        except Exception as e:
+            print(f"[batch] {domain}: {type(e).__name__}: {e}")
+            progress.finish(domain, 'failed')
+        else:
+            progress.finish(domain)
+
+def run_batch(options):
+    domains = read_targets(options['targets'])
+    progress = BatchProgress(f"{options['targets']}.done", options['resume'])
+    pending = progress.pending(domains)
+    if len(pending) < len(domains):
+        print(f"[batch] skipping {len(domains) - len(pending)} domains already finished ({progress.path})")
+    if not pending:
+        return
+    run = BATCH_ENGINES.get(options['engine'])
+    if run is None:
+        print(f"[batch] {len(pending)} domains, one at a time ({options['engine']} engine)")
+        run_sequential(pending, options, progress)
+        return
+    parallel, per_domain = budget(options, pending)
+    print(f"[batch] {len(pending)} domains, {parallel} at a time, {per_domain} concurrent requests each")
+    run(pending, options, progress)
@@ -0,0 +1,138 @@
+import asyncio, os
+from collections import deque
+import aiohttp
+from .seenset import ScalableBloomFilter
+from .metrics import METRICS
+
+# wordlist enumerator의 후보 이름 파이프라인
+# 워드리스트를 한 줄씩 읽고(받는 중인 파일도), 찾은 이름에서 변형(dev-api, api2 등)을 그때그때 만들어
+# DNS worker가 가져갈 때만 다음 후보를 만든다 (메모리는 워드리스트 크기와 상관없이 거의 일정)
+SECLISTS_URL = "https://raw.githubusercontent.com/danielmiessler/SecLists/master/Discovery/DNS/subdomains-top1million-5000.txt"
+PERMUTATION_WORDS = ('dev', 'test', 'stage', 'staging', 'prod', 'qa', 'uat', 'beta', 'demo', 'internal',
+                     'admin', 'api', 'app', 'old', 'new', 'v1', 'v2', 'backup')
+
+def _label(line):
+    label = line.strip().lower()
+    return label if label and not label.startswith('#') else None
+
+async def file_labels(path):
+    with open(path, 'r', errors='ignore') as file:
+        for line in file:
+            label = _label(line)
+            if label:
+                yield label
+
+# 로컬 파일이 없으면 받으면서 바로 후보로 내보내고, 끝까지 받았을 때만 local_filename으로 저장
+async def seclists_labels(url=SECLISTS_URL, local_filename="subdomains-top1million-5000.txt"):
+    if os.path.exists(local_filename):
+        async for label in file_labels(local_filename):
+            yield label
+        return
+    part = local_filename + '.part'
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=300)) as session:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            with open(part, 'wb') as file:
+                async for line in response.content:
+                    file.write(line)
+                    label = _label(line.decode(errors='ignore'))
+                    if label:
+                        yield label
+    os.replace(part, local_filename)
+
+# api.example.com -> dev-api, api-dev, dev.api, api2 ... (.example.com)
+# 숫자로 끝나면 앞뒤 번호 (api2 -> api1, api3)
+def permutations(host, domain, words=PERMUTATION_WORDS):
+    if not host.endswith('.' + domain):
+        return
+    sub = host[:-len(domain) - 1]
+    first, _, rest = sub.partition('.')
+    parent = f"{rest}.{domain}" if rest else domain
+    stem = first.rstrip('0123456789')
+    if stem != first:
+        number = int(first[len(stem):])
+        for n in (number - 1, number + 1):
+            if n >= 0:
+                yield f"{stem}{n}.{parent}"
+    else:
+        for n in (1, 2):
+            yield f"{first}{n}.{parent}"
+    for word in words:
+        if word == first:
+            continue
+        for label in (f"{word}-{first}", f"{first}-{word}"):
+            if len(label) <= 63:
+                yield f"{label}.{parent}"
+        yield f"{word}.{sub}.{domain}"
+
+# DNS worker 여러 개가 같이 꺼내 쓰는 후보 스트림 (async iterator)
+#   - 찾은 이름의 변형을 워드리스트보다 먼저 내보낸다
+#   - 워드리스트가 끝나도 질의 중인 후보가 있으면 기다린다 (그 결과에서 변형이 나올 수 있으므로)
+#   - 같은 후보는 한 번만 (워드리스트의 중복 줄, 변형과 겹치는 줄 포함)
+#     seen은 Bloom filter라서 처음 보는 후보도 오탐률(1e-6)만큼 빠질 수 있다 (100만 줄에 1개 정도)
+class CandidateStream:
+    def __init__(self, domain, labels, permute=False):
+        self.domain = domain
+        self.labels = labels.__aiter__()
+        self.permute = permute
+        self.pending = deque()  # 아직 다 꺼내지 않은 변형 generator
+        self.seen = ScalableBloomFilter(capacity=100000, error_rate=1e-6)  # 내보낸 모든 후보
+        self.seeds = set()      # 변형을 만든 이름 (찾은 이름 수만큼)
+        self.in_flight = 0
+        self.exhausted = False
+        self._lock = asyncio.Lock()
+        self._changed = asyncio.Event()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            candidate = await self._next()
+            if candidate is not None:
+                self.in_flight += 1
+                return candidate
+            if self.pending:
+                # 워드리스트 줄을 기다리는 동안 add()로 들어온 변형 (event는 이미 set됐으므로 기다리면 안 됨)
+                continue
+            if not self.in_flight:
+                raise StopAsyncIteration
+            self._changed.clear()
+            await self._changed.wait()
+
+    # 다음 후보, 지금은 없으면 None
+    async def _next(self):
+        while self.pending:
+            for host in self.pending[0]:
+                if host not in self.seen:
+                    self.seen.add(host)
+                    METRICS.inc('wordlist_candidates', kind='permutation')
+                    return host
+            self.pending.popleft()
+        async with self._lock:
+            while not self.exhausted:
+                try:
+                    label = await self.labels.__anext__()
+                except StopAsyncIteration:
+                    self.exhausted = True
+                    break
+                host = f"{label}.{self.domain}"
+                if host not in self.seen:
+                    self.seen.add(host)
+                    METRICS.inc('wordlist_candidates', kind='wordlist')
+                    return host
+        return None
+
+    # 찾은 이름 (이 스트림의 DNS 결과, 다른 소스의 결과) -> 변형 후보
+    def add(self, host):
+        if self.permute and host != self.domain and host not in self.seeds:
+            self.seeds.add(host)
+            self.pending.append(permutations(host, self.domain))
+            self._changed.set()
+
+    # DnsResolver.resolve_iter의 resolved 콜백 (found: 와일드카드가 아닌 응답)
+    def resolved(self, host, found):
+        self.in_flight -= 1
+        if found:
+            self.add(host)
+        self._changed.set()
@@ -0,0 +1,127 @@
+import json, os, sqlite3
+from scrapy import signals
+from twisted.internet import task
+from .sink import iter_records
+
+# 크롤링 상태를 <domain>.checkpoint.sqlite3 에 저장하고 --resume 시 다시 읽는다
+# 전체를 다시 쓰지 않고 바뀐 것만 쓴다:
+#   frontier: 요청이 스케줄/완료될 때마다 한 줄씩 넣고 지운다
+#   pages   : 본문 fingerprint -> 처음 받은 URL (Deduper.pages 대신, 메모리에 두지 않음)
+#   bloom_filters: seen-set Bloom filter의 필터마다 한 줄, 바뀐 필터만 (꽉 찬 필터는 한 번만)
+#   state   : 서브도메인, 통계 등 작은 JSON
+# 커밋은 interval초마다 save()에서만 한다 (강제 종료되면 마지막 체크포인트로 롤백되어 seen-set, 결과와 맞는다)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (url TEXT PRIMARY KEY, meta TEXT);
+CREATE TABLE IF NOT EXISTS pages (key BLOB PRIMARY KEY, url TEXT) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bloom_filters (i INTEGER PRIMARY KEY, capacity INTEGER, error_rate REAL, count INTEGER,
+                                          bits BLOB);
+CREATE TABLE IF NOT EXISTS state (id INTEGER PRIMARY KEY CHECK (id = 0), value TEXT);
+"""
+
+# Deduper.pages 자리에 들어가는 디스크 기반 dict (setdefault / len만 쓴다)
+class PageIndex:
+    def __init__(self, db):
+        self.db = db
+
+    def setdefault(self, key, url):
+        row = self.db.execute('SELECT url FROM pages WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            return row[0]
+        self.db.execute('INSERT INTO pages VALUES (?, ?)', (key, url))
+        return url
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+class CrawlCheckpoint:
+    def __init__(self, path, interval=30, meta_keys=('depth',)):
+        self.path = path
+        self.interval = float(interval)
+        self.meta_keys = meta_keys
+        self.db = None
+        self.pages = None
+        self._loop = None
+
+    # reset=True면 이전 실행의 체크포인트를 지우고 새로 시작 (--resume이 아닐 때)
+    def open(self, reset=False):
+        if reset:
+            self.remove()
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+        self.pages = PageIndex(self.db)
+        return self
+
+    def connect(self, crawler, save):
+        crawler.signals.connect(self.track, signal=signals.request_scheduled)
+        crawler.signals.connect(self.drop, signal=signals.request_dropped)
+        self._loop = task.LoopingCall(save)
+        self._loop.start(self.interval, now=False)
+
+    def track(self, request, spider):
+        meta = {key: request.meta[key] for key in self.meta_keys if key in request.meta}
+        self.db.execute('INSERT OR REPLACE INTO frontier VALUES (?, ?)', (request.url, json.dumps(meta)))
+
+    def drop(self, request, spider):
+        self.db.execute('DELETE FROM frontier WHERE url = ?', (request.url,))
+
+    # 응답 처리(또는 최종 실패)가 끝난 요청은 frontier에서 뺀다 (리다이렉트 전 URL 포함)
+    def complete(self, request):
+        urls = [request.url] + request.meta.get('redirect_urls', [])
+        self.db.executemany('DELETE FROM frontier WHERE url = ?', [(url,) for url in urls])
+
+    def frontier(self):
+        for url, meta in self.db.execute('SELECT url, meta FROM frontier').fetchall():
+            yield url, json.loads(meta)
+
+    def pending(self):
+        return self.db.execute('SELECT COUNT(*) FROM frontier').fetchone()[0]
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    # finished: 체크포인트 이후에 결과가 이미 기록된 URL (다시 받지 않는다)
+    def load(self, finished=()):
+        self.db.executemany('DELETE FROM frontier WHERE url = ?', [(url,) for url in finished])
+        self.db.commit()
+        row = self.db.execute('SELECT value FROM state WHERE id = 0').fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, state):
+        self.db.execute('INSERT OR REPLACE INTO state VALUES (0, ?)', (json.dumps(state, separators=(',', ':')),))
+        self.db.commit()
+
+    # ScalableBloomFilter를 필터 단위로 저장: count가 그대로인 필터는 다시 쓰지 않는다
+    def save_bloom(self, bloom):
+        saved = dict(self.db.execute('SELECT i, count FROM bloom_filters'))
+        for i, f in enumerate(bloom.filters):
+            if saved.get(i) != f.count:
+                self.db.execute('INSERT OR REPLACE INTO bloom_filters VALUES (?, ?, ?, ?, ?)',
+                                (i, f.capacity, f.error_rate, f.count, bytes(f.bits)))
+        return {'backend': 'bloom', 'capacity': bloom.capacity, 'error_rate': bloom.error_rate, 'checkpoint': True}
+
+    def load_bloom(self, state):
+        return dict(state, filters=[list(row) for row in self.db.execute(
+            'SELECT capacity, error_rate, count, bits FROM bloom_filters ORDER BY i')])
+
+    def stop(self):
+        if self._loop is not None and self._loop.running:
+            self._loop.stop()
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def remove(self):
+        self.close()
+        for path in (self.path, self.path + '-wal', self.path + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+
+def finished_urls(jsonl_path):
+    if not os.path.exists(jsonl_path):
+        return set()
+    return {record['url'] for _, _, record in iter_records(jsonl_path) if record and 'url' in record}
@@ -0,0 +1,136 @@
+import argparse, json
+from .plugins import ENUMERATORS, ENGINES, SINKS, load_plugins, lookup
+from .metrics import METRICS, MetricsServer, profiled
+from .batch import run_batch
+from .limits import MAX_BYTES
+from . import enumeration, sink, spider, fetch, distributed  # 기본 플러그인 등록
+
+# 예전 스크립트들의 기본값 (amas.py / crtns.py / only_crt.py / bs4/sub.py 는 이 preset으로 main을 부른다)
+PRESETS = {
+    'amas': {'sources': 'amass,crtsh', 'engine': 'scrapy', 'schemes': 'http,https'},
+    'crtns': {'sources': 'crtsh,wordlist', 'engine': 'scrapy', 'schemes': 'http', 'expired': True},
+    'only_crt': {'sources': 'crtsh', 'engine': 'scrapy', 'schemes': 'http'},
+    'sub': {'sources': 'crtsh', 'engine': 'sync', 'schemes': 'https'},
+}
+
+def build_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="서브도메인 열거 + 하위 페이지 크롤링")
+    parser.add_argument('domain', nargs='?', help="크롤링할 도메인 (--targets를 쓰면 생략)")
+    parser.add_argument('max_depth', nargs='?', type=int, default=3, help="링크를 따라갈 깊이 (scrapy)")
+    parser.add_argument('--sources', help="enumerator 목록, 쉼표로 구분 (amass, crtsh, wordlist)")
+    parser.add_argument('--engine', help="scrapy / sync / async")
+    parser.add_argument('--async', dest='engine', action='store_const', const='async', help="--engine async")
+    parser.add_argument('--sink', default='json', help="json (<domain>_analysis.json) / jsonl / sqlite (<domain>_analysis.sqlite3)")
+    parser.add_argument('--plugin', dest='plugins', action='append', default=[],
+                        help="enumerator/engine/sink를 등록하는 모듈 (여러 번 가능)")
+    parser.add_argument('--schemes', help="--no-probe 일 때 크롤링할 scheme, 쉼표로 구분")
+    parser.add_argument('--refresh', action='store_true', help="캐시 무시하고 서브도메인 다시 수집")
+    parser.add_argument('--resume', action='store_true', help="마지막 체크포인트부터 이어서 크롤링 (scrapy)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="지난 스캔과 비교해 바뀐 페이지만 받고 변경 내역을 <domain>_diff.json에 기록 (scrapy)")
+    parser.add_argument('--no-probe', dest='probe', action='store_false', help="https/http 확인 없이 모든 호스트를 크롤링")
+    parser.add_argument('--seen', default='bloom', help="seen-URL set: bloom / sqlite / memory")
+    parser.add_argument('--expired', action='store_true', help="crt.sh에서 만료된 인증서도 조회")
+    parser.add_argument('--wordlist', help="wordlist enumerator 파일 (없으면 SecLists top 5000을 받으면서 질의)")
+    parser.add_argument('--permutations', action='store_true',
+                        help="wordlist: 찾은 서브도메인의 변형(dev-api, api2 등)도 DNS로 확인")
+    parser.add_argument('--nameservers', help="wordlist DNS 서버, 예: 8.8.8.8,127.0.0.1:5353")
+    parser.add_argument('--dns-concurrency', type=int, default=100)
+    parser.add_argument('--dns-rate', type=float, default=50, help="초당 DNS 질의 수")
+    parser.add_argument('--concurrency', type=int, default=50, help="전체 동시 연결 수 (probe, async)")
+    parser.add_argument('--per-host', type=int, default=4, help="호스트당 동시 연결 수 (async)")
+    parser.add_argument('--timeout', type=float, default=10, help="요청당 제한시간, 초 (probe, async)")
+    parser.add_argument('--parse-workers', type=int, default=None, help="HTML 파싱 프로세스 수, 0이면 사용 안 함 (async)")
+    parser.add_argument('--max-links', type=int, default=5, help="서브도메인마다 분석할 링크 수 (sync, async)")
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES,
+                        help="응답 본문을 받을 최대 바이트, 넘으면 앞부분만 분석 (0이면 제한 없음)")
+    parser.add_argument('--all-types', action='store_true', help="HTML이 아닌 응답(이미지, 압축 파일 등)도 끝까지 받기")
+    parser.add_argument('--form-concurrency', type=int, default=4, help="동시에 보내는 폼 제출 수, 0이면 보내지 않음 (sync, async)")
+    parser.add_argument('--form-rate', type=float, default=5, help="초당 폼 제출 수 (sync, async)")
+    parser.add_argument('--set', dest='settings', action='append', default=[], metavar='NAME=VALUE',
+                        help="Scrapy 설정 덮어쓰기, 예: --set DOWNLOAD_DELAY=0 (여러 번 가능)")
+    parser.add_argument('--workers', type=int, default=1, help="호스트 해시로 나눠 크롤링할 worker 프로세스 수 (scrapy)")
+    parser.add_argument('--role', choices=('all', 'coordinator', 'worker'), default='all',
+                        help="여러 노드에서 돌릴 때: coordinator 하나 + --shard마다 worker 하나")
+    parser.add_argument('--shard', type=int, default=0, help="worker가 맡을 shard 번호 (--role worker)")
+    parser.add_argument('--queue', help="공유 큐 SQLite 파일 (기본 <domain>.queue.sqlite3)")
+    parser.add_argument('--targets', metavar='FILE', help="도메인 목록 파일 (한 줄에 하나): 한 프로세스에서 연결 풀/캐시를 같이 쓰며 크롤링")
+    parser.add_argument('--global-concurrency', type=int, default=64, help="--targets: 모든 도메인을 합친 동시 요청 수")
+    parser.add_argument('--domain-concurrency', type=int, default=16, help="--targets: 도메인 하나의 동시 요청 수")
+    parser.add_argument('--metrics-port', type=int, help="실행 중 http://127.0.0.1:<port>/metrics 로 OpenMetrics 노출")
+    parser.add_argument('--metrics-out', help="끝난 뒤 최종 메트릭을 OpenMetrics 텍스트로 저장할 파일")
+    parser.add_argument('--profile', choices=('cprofile', 'pyinstrument'), help="메인 스레드 프로파일 캡처")
+    parser.add_argument('--profile-out', help="프로파일 저장 파일 (기본 subcrawler.prof / subcrawler.profile.html)")
+    return parser
+
+def parse_options(argv=None, preset='amas', prog=None):
+    parser = build_parser(prog)
+    parser.set_defaults(**PRESETS[preset])
+    options = vars(parser.parse_args(argv))
+    load_plugins(options['plugins'])
+    try:
+        options['sources'] = tuple(options['sources'].split(','))
+        for name in options['sources']:
+            lookup(ENUMERATORS, 'enumerator', name)
+        lookup(ENGINES, 'engine', options['engine'])
+        lookup(SINKS, 'sink', options['sink'])
+    except ValueError as e:
+        parser.error(str(e))
+    options['schemes'] = tuple(options['schemes'].split(','))
+    options['settings'] = dict(setting_arg(item, parser) for item in options['settings'])
+    if options['targets']:
+        # --targets list.txt 2 처럼 쓰면 첫 위치 인자는 깊이
+        if options['domain'] is not None:
+            if not options['domain'].isdigit():
+                parser.error("give either a domain or --targets, not both")
+            options['max_depth'] = int(options['domain'])
+            options['domain'] = None
+        if options['workers'] > 1 or options['role'] != 'all':
+            parser.error("--targets cannot be combined with --workers / --role")
+        if options['global_concurrency'] < 1 or options['domain_concurrency'] < 1:
+            parser.error("--global-concurrency / --domain-concurrency must be at least 1")
+    elif options['domain'] is None:
+        parser.error("a domain or --targets FILE is required")
+    if options['workers'] > 1 or options['role'] != 'all':
+        if options['engine'] != 'scrapy':
+            parser.error("--workers / --role need the scrapy engine")
+        options['engine'] = 'distributed'
+    if options['incremental'] and options['engine'] not in ('scrapy', 'distributed'):
+        parser.error("--incremental needs the scrapy engine")
+    options['source_options'] = {
+        'crtsh': {'expired': options['expired']},
+        'wordlist': {'path': options['wordlist'], 'nameservers': options['nameservers'],
+                     'concurrency': options['dns_concurrency'], 'rate': options['dns_rate'],
+                     'permutations': options['permutations']},
+    }
+    return options
+
+# 값은 JSON으로 읽고 (숫자, true, 리스트, dict), 안 되면 문자열 그대로
+def setting_arg(item, parser):
+    name, sep, value = item.partition('=')
+    if not sep:
+        parser.error(f"--set needs NAME=VALUE, got {item!r}")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+def main(argv=None, preset='amas', prog=None):
+    options = parse_options(argv, preset, prog)
+    server = None
+    if options['metrics_port'] is not None:
+        server = MetricsServer(options['metrics_port']).start()
+        print(f"Metrics at {server.url}")
+    try:
+        with profiled(options['profile'], options['profile_out']):
+            if options['targets']:
+                run_batch(options)
+            else:
+                ENGINES[options['engine']](options['domain'], options)
+    finally:
+        print(METRICS.summary())
+        if options['metrics_out']:
+            with open(options['metrics_out'], 'w', encoding='utf-8') as f:
+                f.write(METRICS.render())
+        if server:
+            server.stop()
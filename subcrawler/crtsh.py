@@ -0,0 +1,87 @@
+import codecs, json, re
+import aiohttp
+from .scope import scope_for
+
+CHUNK_SIZE = 64 * 1024
+_SKIP = re.compile(r'[\s,]*')
+
+def crtsh_url(domain, expired=False):
+    url = f"https://crt.sh/?q=%.{domain}&output=json"
+    if expired:
+        url += "&expired=yes"
+    return url
+
+# crt.sh의 JSON 배열을 청크 단위로 받아 항목(dict)을 하나씩 꺼낸다
+# 전체 본문을 메모리에 올리지 않고, 청크 경계에 걸린 항목 하나만 버퍼에 남긴다
+class JsonArrayStream:
+    def __init__(self):
+        self._decode = json.JSONDecoder().raw_decode
+        self._text = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._buffer = ''
+        self.started = False
+        self.done = False
+
+    def feed(self, chunk):
+        buffer = self._buffer + self._text.decode(chunk)
+        items = []
+        pos = 0
+        while not self.done:
+            pos = _SKIP.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            if not self.started:
+                if buffer[pos] != '[':
+                    raise ValueError("crt.sh response is not a JSON array")
+                self.started = True
+                pos += 1
+            elif buffer[pos] == ']':
+                self.done = True
+                pos += 1
+            else:
+                try:
+                    item, pos = self._decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # 항목이 잘림 -> 다음 청크와 이어서 다시
+                items.append(item)
+        self._buffer = buffer[pos:]
+        return items
+
+    def close(self):
+        rest = self._buffer + self._text.decode(b'', final=True)
+        if not self.done and (self.started or rest.strip()):
+            raise ValueError("Truncated crt.sh response")
+
+# name_value는 "a.example.com\n*.b.example.com"처럼 여러 줄일 수 있다
+# seen에는 원래 이름도 넣어서 같은 이름이 반복되면 정규화도 건너뛴다
+def hostnames(items, domain, seen):
+    normalize = scope_for(domain).normalize
+    for item in items:
+        for name in item.get('name_value', '').split('\n'):
+            if name in seen:
+                continue
+            host = normalize(name)
+            new = host and host not in seen
+            seen.add(name)
+            if new:
+                seen.add(host)
+                yield host
+
+# 청크 iterable -> 정규화(소문자, *. 제거, IDNA)/중복제거된 범위 내 호스트
+# 메모리는 응답 크기가 아니라 고유 호스트 수에 비례
+def parse_chunks(chunks, domain):
+    stream = JsonArrayStream()
+    seen = set()
+    for chunk in chunks:
+        yield from hostnames(stream.feed(chunk), domain, seen)
+    stream.close()
+
+async def crtsh_source(domain, expired=False, timeout=60):
+    stream = JsonArrayStream()
+    seen = set()
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        async with session.get(crtsh_url(domain, expired)) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                for host in hostnames(stream.feed(chunk), domain, seen):
+                    yield host
+    stream.close()
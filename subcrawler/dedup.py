@@ -0,0 +1,89 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from .seenset import ScalableBloomFilter
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# 같은 페이지를 가리키는 URL을 하나로: 소문자 호스트, 기본 포트/fragment 제거, 쿼리 정렬
+def canonicalize_url(url):
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+def fingerprint(body):
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+# URL 중복(요청 자체를 생략)과 본문 중복(추출/저장 생략)을 걸러내고 절약량을 센다
+# seen: seenset.make_seen_set()으로 만든 bloom/sqlite seen-set, 없으면 set()
+# pages: 본문 fingerprint -> 처음 받은 URL, 없으면 dict (체크포인트가 있으면 디스크 기반 PageIndex)
+class Deduper:
+    def __init__(self, seen=None, pages=None):
+        self.seen_urls = set() if seen is None else seen
+        self.pages = {} if pages is None else pages
+        self.skipped_fetches = 0
+        self.duplicate_pages = 0
+        self.saved_bytes = 0
+
+    def seen_url(self, url):
+        key = canonicalize_url(url)
+        if key in self.seen_urls:
+            self.skipped_fetches += 1
+            return True
+        self.seen_urls.add(key)
+        return False
+
+    def duplicate_of(self, url, body):
+        first_url = self.pages.setdefault(fingerprint(body), url)
+        if first_url == url:
+            return None
+        self.duplicate_pages += 1
+        self.saved_bytes += len(body)
+        return first_url
+
+    def summary(self):
+        return (f"Dedup: skipped {self.skipped_fetches} duplicate fetches, "
+                f"{self.duplicate_pages} duplicate pages ({self.saved_bytes} bytes) not re-analyzed")
+
+    # 체크포인트 저장/복구용
+    # checkpoint(CrawlCheckpoint)를 주면 Bloom filter는 체크포인트 DB에 바뀐 필터만 쓰고 state에는 참조만 남긴다
+    # (sqlite seen-set은 파일 경로만, memory는 예전처럼 전체 목록)
+    def state(self, checkpoint=None):
+        seen = self.seen_urls
+        if isinstance(seen, set):
+            seen_state = list(seen)
+        elif checkpoint is not None and isinstance(seen, ScalableBloomFilter):
+            seen_state = checkpoint.save_bloom(seen)
+        else:
+            seen_state = seen.state()
+        state = {'seen_urls': seen_state, 'stats': [self.skipped_fetches, self.duplicate_pages, self.saved_bytes]}
+        if isinstance(self.pages, dict):
+            state['pages'] = {key.hex(): url for key, url in self.pages.items()}
+        return state
+
+    def restore(self, state, checkpoint=None):
+        seen = state['seen_urls']
+        if isinstance(seen, dict) and seen.get('checkpoint'):
+            seen = checkpoint.load_bloom(seen)
+        if isinstance(self.seen_urls, set):
+            self.seen_urls = set(seen)
+        else:
+            self.seen_urls.restore(seen)
+        if 'pages' in state and isinstance(self.pages, dict):
+            self.pages = {bytes.fromhex(key): url for key, url in state['pages'].items()}
+        self.skipped_fetches, self.duplicate_pages, self.saved_bytes = state['stats']
+
+    # 체크포인트가 저장된 뒤에 부른다 (sqlite seen-set 커밋)
+    def commit(self):
+        if not isinstance(self.seen_urls, set):
+            self.seen_urls.commit()
+
+    def close(self):
+        if not isinstance(self.seen_urls, set):
+            self.seen_urls.close()
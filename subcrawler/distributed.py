@@ -0,0 +1,323 @@
+import asyncio, hashlib, logging, multiprocessing, os, shutil, sqlite3, time
+from urllib.parse import urlsplit
+from scrapy.exceptions import DontCloseSpider
+from twisted.internet import task
+from .plugins import engine, load_plugins, SINKS
+from .spider import DomainSpider, run_scrapy
+from .sink import finalize_json, iter_records
+from .probe import Prober
+from .enum_cache import EnumCache
+from .enumeration import enumerate_subdomains
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# 분산 모드: coordinator가 서브도메인을 열거해서 공유 큐에 넣고,
+# worker N개가 호스트 해시로 나눈 shard를 하나씩 맡아 기존 DomainSpider로 크롤링한다
+#   - 호스트(와 그 호스트의 URL)는 항상 같은 shard가 맡으므로 seen-set, 본문 dedup, 호스트별 throttle은 worker 안에서 끝난다
+#   - 다른 shard의 호스트로 가는 링크는 큐의 urls 테이블로 넘긴다
+#   - 큐 백엔드는 SQLite (WAL). 여러 노드에서 돌릴 때는 큐 파일과 작업 디렉터리를 공유 스토리지에 둔다
+def shard_of(host, shards):
+    return int.from_bytes(hashlib.blake2b(host.encode(), digest_size=8).digest(), 'big') % shards
+
+class SqliteQueue:
+    def __init__(self, path, shards=None, reset=False):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        if reset:
+            for table in ('hosts', 'urls', 'workers', 'meta'):
+                self.conn.execute(f'DROP TABLE IF EXISTS {table}')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS hosts (host TEXT PRIMARY KEY, origin TEXT, shard INTEGER, claimed INTEGER DEFAULT 0);
+            CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, subdomain TEXT, depth INTEGER, shard INTEGER,
+                                             claimed INTEGER DEFAULT 0);
+            CREATE TABLE IF NOT EXISTS workers (shard INTEGER PRIMARY KEY, idle INTEGER DEFAULT 0,
+                                                finished INTEGER DEFAULT 0, seen REAL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE INDEX IF NOT EXISTS hosts_pending ON hosts (shard, claimed);
+            CREATE INDEX IF NOT EXISTS urls_pending ON urls (shard, claimed);
+        ''')
+        if shards is not None:
+            self._set('shards', int(shards))
+        self._shards = None
+
+    def _set(self, key, value):
+        self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, str(value)))
+
+    def _get(self, key, default=None):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    @property
+    def shards(self):
+        if self._shards is None:
+            value = self._get('shards')
+            if value is None:
+                raise ValueError(f"{self.path} has no shard count, start the coordinator first")
+            self._shards = int(value)
+        return self._shards
+
+    def set_enumerating(self, enumerating):
+        self._set('enumerating', int(enumerating))
+
+    def enumerating(self):
+        return self._get('enumerating', '1') == '1'
+
+    # origin의 호스트로 shard를 정한다 (그 origin에서 나오는 링크를 같은 worker가 따라가도록)
+    def add_hosts(self, hosts):
+        rows = [(host, origin, shard_of(urlsplit(origin).hostname if origin else host, self.shards))
+                for host, origin in hosts]
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO hosts (host, origin, shard) VALUES (?, ?, ?)', rows)
+
+    def push_urls(self, urls):
+        rows = [(url, subdomain, depth, shard_of(urlsplit(url).hostname or '', self.shards))
+                for url, subdomain, depth in urls]
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO urls (url, subdomain, depth, shard) VALUES (?, ?, ?, ?)', rows)
+        METRICS.inc('shard_urls_pushed', len(rows))
+
+    def register(self, shard):
+        self.conn.execute('INSERT OR REPLACE INTO workers VALUES (?, 0, 0, ?)', (shard, time.time()))
+
+    # 자기 shard의 대기 항목을 가져가고, 하나라도 있으면 같은 트랜잭션에서 busy로 표시
+    def claim(self, shard, limit=200):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            hosts = self.conn.execute('''UPDATE hosts SET claimed = 1 WHERE rowid IN
+                (SELECT rowid FROM hosts WHERE shard = ? AND claimed = 0 LIMIT ?) RETURNING host, origin''',
+                (shard, limit)).fetchall()
+            urls = self.conn.execute('''UPDATE urls SET claimed = 1 WHERE rowid IN
+                (SELECT rowid FROM urls WHERE shard = ? AND claimed = 0 LIMIT ?) RETURNING url, subdomain, depth''',
+                (shard, limit)).fetchall()
+            if hosts or urls:
+                self.conn.execute('UPDATE workers SET idle = 0, seen = ? WHERE shard = ?', (time.time(), shard))
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return hosts, urls
+
+    # idle worker는 아무것도 만들지 않으므로, 열거가 끝났고 대기 항목이 없고 모든 worker가 idle이면 전체 종료
+    def set_idle(self, shard):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.execute('UPDATE workers SET idle = 1, seen = ? WHERE shard = ?', (time.time(), shard))
+            done = (
+                not self.enumerating()
+                and not self.conn.execute('SELECT 1 FROM hosts WHERE claimed = 0 LIMIT 1').fetchone()
+                and not self.conn.execute('SELECT 1 FROM urls WHERE claimed = 0 LIMIT 1').fetchone()
+                and not self.conn.execute('SELECT 1 FROM workers WHERE idle = 0 AND finished = 0 LIMIT 1').fetchone()
+            )
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return done
+
+    def finish(self, shard):
+        self.conn.execute('UPDATE workers SET idle = 1, finished = 1, seen = ? WHERE shard = ?', (time.time(), shard))
+
+    def finished_workers(self):
+        return self.conn.execute('SELECT COUNT(*) FROM workers WHERE finished = 1').fetchone()[0]
+
+    # 이어서 실행할 때: worker 상태를 지우고 다시 등록하게 한다 (가져간 항목은 각 worker 체크포인트에 남아 있음)
+    def restart(self):
+        self.conn.execute('DELETE FROM workers')
+
+    def pending(self):
+        return sum(self.conn.execute(f'SELECT COUNT(*) FROM {table} WHERE claimed = 0').fetchone()[0]
+                   for table in ('hosts', 'urls'))
+
+    def close(self):
+        self.conn.close()
+
+# 큐에서 자기 shard의 호스트/URL을 받아서 크롤링하는 DomainSpider
+class ShardSpider(DomainSpider):
+    name = "shard_spider"
+
+    def __init__(self, queue=None, shard=0, poll_interval=0.5, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queue = SqliteQueue(queue)
+        self.shard = int(shard)
+        self.shards = self.queue.shards
+        self.poll_interval = float(poll_interval)
+        self.outgoing = []
+        self.poller = None
+        self.enumerating = True  # 체크포인트 값과 관계없이 큐를 계속 본다
+        self.queue.register(self.shard)
+
+    def start_enumeration(self):
+        self.poller = task.LoopingCall(self.tick)
+        self.poller.start(self.poll_interval, now=False)
+
+    # spider_idle은 5초마다만 오므로, 일이 없으면 여기서도 종료 조건을 확인한다
+    def tick(self):
+        if not self.poll() and self.crawler.engine.spider_is_idle() and self.queue.set_idle(self.shard):
+            self.poller.stop()
+            self.crawler.engine.close_spider(self, 'finished')
+
+    def poll(self):
+        self.flush_outgoing()
+        hosts, urls = self.queue.claim(self.shard)
+        for host, origin in hosts:
+            self.add_subdomain(host, origin)
+        for url, subdomain, depth in urls:
+            request = super().follow(url, subdomain, depth)
+            if request is not None:
+                self.crawler.engine.crawl(request)
+        return bool(hosts or urls)
+
+    def follow(self, url, subdomain, depth):
+        if shard_of(urlsplit(url).hostname or '', self.shards) != self.shard:
+            self.outgoing.append((url, subdomain, depth))
+            return None
+        return super().follow(url, subdomain, depth)
+
+    def flush_outgoing(self):
+        if self.outgoing:
+            self.queue.push_urls(self.outgoing)
+            self.outgoing = []
+
+    def spider_idle(self):
+        if self.poll() or not self.queue.set_idle(self.shard):
+            raise DontCloseSpider
+
+    def closed(self, reason):
+        if self.poller is not None and self.poller.running:
+            self.poller.stop()
+        self.flush_outgoing()
+        if reason == 'finished':
+            self.queue.finish(self.shard)
+        super().closed(reason)
+        self.queue.close()
+
+def _queue_ready(path):
+    if not os.path.exists(path):
+        return False
+    conn = sqlite3.connect(path, timeout=60)
+    try:
+        return conn.execute("SELECT 1 FROM meta WHERE key = 'shards'").fetchone() is not None
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+def shard_output(domain, shard):
+    return f"{domain}.shard{shard}"
+
+def run_worker(domain, options, queue_path, shard):
+    load_plugins(options['plugins'])  # spawn으로 뜬 프로세스는 플러그인을 다시 불러와야 한다
+    run_scrapy(domain, options, spidercls=ShardSpider, queue=queue_path, shard=shard, sink='jsonl',
+               output=shard_output(domain, shard))
+
+def _local_worker(domain, options, queue_path, shard):
+    try:
+        run_worker(domain, options, queue_path, shard)
+    finally:
+        print(f"[shard {shard}] " + METRICS.summary())
+
+async def _enumerate_into(queue, domain, options):
+    hosts = enumerate_subdomains(domain, options['sources'], options['source_options'], EnumCache(),
+                                 options['refresh'], include=(domain,))
+    count = 0
+    if options['probe']:
+        prober = Prober(domain, concurrency=options['concurrency'], timeout=options['timeout'])
+        async for host, origin in prober.probe_iter(hosts):
+            queue.add_hosts([(host, origin)])
+            count += 1
+        logger.info(prober.summary())
+    else:
+        async for host in hosts:
+            queue.add_hosts([(host, None)])
+            count += 1
+    return count
+
+def _concat(path, shard_paths):
+    found = False
+    with open(path, 'wb') as out:
+        for shard_path in shard_paths:
+            if not os.path.exists(shard_path):
+                continue
+            found = True
+            with open(shard_path, 'rb') as f:
+                shutil.copyfileobj(f, out)
+            os.remove(shard_path)
+    return found
+
+# shard별 JSONL을 합쳐서 기존과 같은 <domain>_analysis.json을 만든다 (--incremental이면 <domain>_diff.json도)
+def merge_shards(domain, shards, sink='json'):
+    path = f"{domain}_analysis.jsonl"
+    _concat(path, [f"{shard_output(domain, shard)}_analysis.jsonl" for shard in range(shards)])
+    diff_path = f"{domain}_diff.jsonl"
+    has_diff = _concat(diff_path, [f"{shard_output(domain, shard)}_diff.jsonl" for shard in range(shards)])
+    if not has_diff:
+        os.remove(diff_path)
+    if sink == 'json':
+        with METRICS.timer('sink_finalize_seconds'):
+            finalize_json(path, f"{domain}_analysis.json")
+            if has_diff:
+                finalize_json(diff_path, f"{domain}_diff.json", pages_key=None)
+        return f"{domain}_analysis.json"
+    if sink != 'jsonl':
+        # 그 밖의 sink(sqlite 등)에는 합친 JSONL을 한 건씩 다시 넣는다
+        target = SINKS[sink](domain)
+        for _, key, record in iter_records(path):
+            target.write(key, record)
+        target.close()
+        os.remove(path)
+        return target.path
+    return path
+
+# role: all (coordinator + 로컬 worker --workers개) / coordinator (열거 + 종료 대기 + 병합) / worker (--shard 하나)
+@engine('distributed')
+def run_distributed(domain, options):
+    queue_path = options['queue'] or f"{domain}.queue.sqlite3"
+    role = options['role']
+    if role == 'worker':
+        # coordinator가 큐를 만들 때까지 기다린다 (노드마다 시작 순서가 다를 수 있음)
+        while not _queue_ready(queue_path):
+            time.sleep(1)
+        run_worker(domain, options, queue_path, options['shard'])
+        return
+
+    shards = options['workers']
+    queue = SqliteQueue(queue_path, shards, reset=not options['resume'])
+    queue.restart()
+    queue.set_enumerating(True)
+    processes = []
+    if role == 'all':
+        context = multiprocessing.get_context('spawn')  # Twisted reactor를 fork로 물려받지 않도록
+        for shard in range(shards):
+            process = context.Process(target=_local_worker, args=(domain, options, queue_path, shard),
+                                      name=f"worker-{shard}")
+            process.start()
+            processes.append(process)
+
+    try:
+        count = asyncio.run(_enumerate_into(queue, domain, options))
+        queue.set_enumerating(False)
+        print(f"Found {count} subdomains, sharded across {shards} workers")
+        if processes:
+            for process in processes:
+                process.join()
+        else:
+            while queue.finished_workers() < shards:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()  # worker도 SIGINT를 받아 체크포인트를 남기고 끝난다
+        print(f"Interrupted, continue with --resume ({queue.pending()} queued items left)")
+        return
+    finally:
+        queue.close()
+
+    failed = [process.name for process in processes if process.exitcode]
+    if failed:
+        print(f"Workers failed: {', '.join(failed)}, continue with --resume")
+        return
+    output = merge_shards(domain, shards, options['sink'])
+    os.remove(queue_path)
+    print(f"Results saved to {output}")
@@ -0,0 +1,32 @@
+import json, sqlite3, threading, time
+
+# crt.sh / amass 결과를 (domain, source) 단위로 SQLite에 저장 (source는 옵션을 포함한 키, 예: crtsh:expired)
+# ttl(초)이 지나면 만료, refresh=True면 캐시를 무시하고 다시 조회
+# batch 모드에서는 여러 도메인의 열거가 한 인스턴스를 같이 쓰므로 lock으로 직렬화
+class EnumCache:
+    def __init__(self, path='enum_cache.sqlite3', ttl=86400):
+        self.path = path
+        self.ttl = float(ttl)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.db.execute('CREATE TABLE IF NOT EXISTS enum_cache ('
+                        'domain TEXT, source TEXT, fetched_at REAL, hosts TEXT, '
+                        'PRIMARY KEY (domain, source))')
+        self.db.commit()
+
+    def get(self, domain, source):
+        with self._lock:
+            row = self.db.execute('SELECT fetched_at, hosts FROM enum_cache WHERE domain = ? AND source = ?',
+                                  (domain, source)).fetchone()
+        if row is None or time.time() - row[0] > self.ttl:
+            return None
+        return json.loads(row[1])
+
+    def set(self, domain, source, hosts):
+        with self._lock:
+            self.db.execute('INSERT OR REPLACE INTO enum_cache VALUES (?, ?, ?, ?)',
+                            (domain, source, time.time(), json.dumps(sorted(hosts))))
+            self.db.commit()
+
+    def close(self):
+        self.db.close()
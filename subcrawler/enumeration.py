@@ -0,0 +1,209 @@
+import asyncio, logging, threading, time
+from .plugins import ENUMERATORS, CACHEABLE, CACHE_OPTIONS, FEEDBACK, enumerator
+from .metrics import METRICS
+from .resolver import DnsResolver
+from .probe import Prober
+from .scope import scope_for
+from .crtsh import crtsh_source
+from .candidates import CandidateStream, file_labels, seclists_labels
+
+logger = logging.getLogger(__name__)
+
+# 각 소스는 호스트 이름을 하나씩 내보내는 async generator
+# 새 소스는 plugins.enumerator(이름)으로 등록하면 된다
+@enumerator('amass', cacheable=True)
+async def amass_source(domain):
+    process = await asyncio.create_subprocess_exec(
+        'amass', 'enum', '-d', domain,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        async for line in process.stdout:
+            fields = line.decode(errors='ignore').split()
+            if fields:
+                yield fields[0]  # amass v4는 "name (FQDN) --> ..." 형식
+    finally:
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+
+# path가 없으면 SecLists 워드리스트를 받으면서 바로 질의한다
+# 후보는 DNS worker가 비는 대로 한 줄씩 읽으므로 워드리스트 크기와 상관없이 메모리가 일정하다 (candidates.py)
+# permutations: 찾은 이름(이 소스와 다른 소스가 찾은 found)에서 dev-api, api2 같은 변형도 질의
+# resolver: 여러 도메인이 네임서버별 rate limit을 같이 지키도록 공유할 DnsResolver (batch 모드)
+@enumerator('wordlist', feedback=True)
+async def wordlist_source(domain, path=None, nameservers=None, concurrency=100, rate=50, resolver=None,
+                          permutations=False, found=None):
+    labels = file_labels(path) if path is not None else seclists_labels()
+    candidates = CandidateStream(domain, labels, permute=permutations)
+    if found is not None:
+        found.watch(candidates.add)
+    resolver = resolver or DnsResolver(nameservers=nameservers, concurrency=concurrency, rate=rate)
+    async for host, _ in resolver.resolve_iter(candidates, domain, resolved=candidates.resolved):
+        yield host
+
+enumerator('crtsh', cacheable=True, cache_options=('expired',))(crtsh_source)
+
+# 캐시 키: 소스 이름 + 결과를 바꾸는 옵션 (crtsh / crtsh:expired), 기본값이면 이름만
+def _cache_key(name, kwargs):
+    parts = [name]
+    for option in CACHE_OPTIONS.get(name, ()):
+        value = kwargs.get(option)
+        if value is True:
+            parts.append(option)
+        elif value:
+            parts.append(f"{option}={value}")
+    return ':'.join(parts)
+
+async def _cached(cache, domain, name, hosts, refresh):
+    cached = None if refresh else cache.get(domain, name)
+    if cached is not None:
+        for host in cached:
+            yield host
+        return
+    found = []
+    async for host in hosts:
+        found.append(host)
+        yield host
+    if found:
+        cache.set(domain, name, found)
+
+# 지금까지 찾은 호스트를 feedback 소스에 알려 준다 (나중에 watch해도 앞의 것부터 받음)
+class Found:
+    def __init__(self):
+        self.hosts = []
+        self.watchers = []
+
+    def add(self, host):
+        self.hosts.append(host)
+        for watcher in self.watchers:
+            watcher(host)
+
+    def watch(self, callback):
+        self.watchers.append(callback)
+        for host in self.hosts:
+            callback(host)
+
+# 모든 소스를 동시에 돌리고, 정규화/중복제거된 새 호스트를 찾는 즉시 내보낸다
+# include: 소스와 관계없이 먼저 내보낼 호스트 (메인 도메인 등)
+async def enumerate_subdomains(domain, sources=('amass', 'crtsh'), options=None, cache=None, refresh=False, log=None,
+                               include=()):
+    log = log or logger
+    options = options or {}
+    queue = asyncio.Queue()
+    seen = set()
+    normalize = scope_for(domain).normalize
+    found = Found()
+    METRICS.set('enumeration_queue_depth', queue.qsize)
+    for host in include:
+        host = normalize(host)
+        if host and host not in seen:
+            seen.add(host)
+            METRICS.inc('subdomains')
+            yield host
+
+    async def run(name):
+        count = 0
+        start = time.perf_counter()
+        try:
+            kwargs = dict(options.get(name, {}))
+            if name in FEEDBACK:
+                kwargs['found'] = found
+            hosts = ENUMERATORS[name](domain, **kwargs)
+            if cache is not None and name in CACHEABLE:
+                hosts = _cached(cache, domain, _cache_key(name, kwargs), hosts, refresh)
+            async for host in hosts:
+                count += 1
+                METRICS.inc('enumerated_names', source=name)
+                await queue.put(host)
+        except Exception as e:
+            METRICS.inc('enumeration_errors', source=name)
+            log.error(f"Error running {name}: {str(e)}")
+        finally:
+            METRICS.observe('enumeration_seconds', time.perf_counter() - start, source=name)
+            log.info(f"{name} returned {count} names")
+            await queue.put(None)
+
+    tasks = [asyncio.ensure_future(run(name)) for name in sources]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            host = await queue.get()
+            if host is None:
+                remaining -= 1
+                continue
+            host = normalize(host)
+            if host and host not in seen:
+                seen.add(host)
+                METRICS.inc('subdomains')
+                found.add(host)
+                yield host
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# Scrapy(Twisted) 쪽에서 쓰기 위해 별도 스레드의 이벤트 루프에서 실행
+# on_host / on_done은 이 스레드에서 호출되므로 reactor.callFromThread로 넘길 것
+# probe: Prober 옵션 dict를 주면 살아 있는 호스트만 on_host(host, origin)으로 넘긴다 (origin마다 한 번)
+# loop: 이미 돌고 있는 이벤트 루프(EnumerationLoop.loop)를 주면 새 스레드 대신 거기서 실행
+def enumerate_in_thread(domain, on_host, on_done, probe=None, loop=None, **kwargs):
+    async def consume():
+        hosts = enumerate_subdomains(domain, **kwargs)
+        if probe is None:
+            async for host in hosts:
+                on_host(host)
+            return
+        prober = Prober(domain, **probe)
+        async for host, origin in prober.probe_iter(hosts):
+            on_host(host, origin)
+        (kwargs.get('log') or logger).info(prober.summary())
+
+    async def run_in_loop():
+        try:
+            await consume()
+        except Exception as e:
+            (kwargs.get('log') or logger).error(f"Enumeration of {domain} failed: {str(e)}")
+        finally:
+            on_done()
+
+    if loop is not None:
+        return asyncio.run_coroutine_threadsafe(run_in_loop(), loop)
+
+    def run():
+        try:
+            asyncio.run(consume())
+        finally:
+            on_done()
+
+    thread = threading.Thread(target=run, name=f"enumerate-{domain}", daemon=True)
+    thread.start()
+    return thread
+
+# 여러 도메인의 열거를 한 스레드의 이벤트 루프 하나에서 돌린다 (batch 모드)
+# DnsResolver, probe 연결 풀처럼 루프에 묶인 자원을 도메인끼리 공유할 수 있다
+class EnumerationLoop:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='enumerate-batch', daemon=True)
+        self.thread.start()
+
+    # 루프 안에서 만들어야 하는 객체(aiohttp 커넥터 등)는 이걸로 만든다
+    def call(self, func, *args, **kwargs):
+        async def run():
+            return func(*args, **kwargs)
+        return self.run(run())
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self):
+        async def shutdown():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.run(shutdown())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
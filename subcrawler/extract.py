@@ -0,0 +1,189 @@
+from urllib.parse import urljoin
+import lxml.html
+from lxml import etree
+
+# HTML 한 번 파싱 + 트리 한 번 순회로 페이지 정보 추출
+# 순수 함수라 ProcessPoolExecutor에서 그대로 돌릴 수 있다
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+SKIP_INPUT_TYPES = ['button', 'submit', 'reset']
+# libxml2는 값 없는 불리언 속성을 checked="checked"로 채우지만 bs4는 checked=""로 둔다
+BOOLEAN_ATTRS = {'checked', 'disabled', 'readonly', 'required', 'selected', 'multiple', 'autofocus', 'hidden'}
+
+def parse_html(content, encoding=None):
+    if not content or not content.strip():
+        return None
+    parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+    try:
+        return lxml.html.fromstring(content, parser=parser)
+    except (etree.ParserError, LookupError, ValueError):
+        return None
+
+def _escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def _attr(name, value):
+    if name in BOOLEAN_ATTRS and value == name:
+        value = ''
+    value = _escape(value)
+    if '"' in value:
+        if "'" not in value:
+            return f"{name}='{value}'"
+        value = value.replace('"', '&quot;')
+    return f'{name}="{value}"'
+
+# BeautifulSoup str(tag)와 같은 형식 (속성 이름순 정렬, void 태그는 <tag/>)
+def tag_html(el):
+    attrs = ''.join(' ' + _attr(name, value) for name, value in sorted(el.attrib.items()))
+    if el.tag in VOID_TAGS:
+        return f"<{el.tag}{attrs}/>"
+    parts = [f"<{el.tag}{attrs}>", _escape(el.text or '')]
+    for child in el:
+        if isinstance(child.tag, str):
+            parts.append(tag_html(child))
+        parts.append(_escape(child.tail or ''))
+    parts.append(f"</{el.tag}>")
+    return ''.join(parts)
+
+def _option_value(select):
+    option = next(select.iter('option'), None)
+    if option is None:
+        return ''
+    return option.get('value', option.text_content())
+
+# bs4/sub.py analyze_page 형식: input_tags, form_data, csrf_token + 페이지 링크
+# forms: 폼 제출 probe용 (action은 base_url 기준 절대 URL, method는 GET/POST, fields는 폼 안의 필드)
+def analyze_html(content, base_url, encoding=None):
+    input_tags = []
+    form_data = {}
+    csrf_token = None
+    csrf_found = False
+    links = []
+    forms = {}
+
+    root = parse_html(content, encoding)
+    if root is not None:
+        for el in root.iter('input', 'textarea', 'select', 'meta', 'a', 'form'):
+            tag = el.tag
+            if tag == 'a':
+                href = el.get('href')
+                if href is not None:
+                    links.append(urljoin(base_url, href))
+            elif tag == 'form':
+                method = (el.get('method') or 'get').upper()
+                forms[el] = {'action': urljoin(base_url, el.get('action') or ''),
+                             'method': method if method in ('GET', 'POST') else 'GET', 'fields': {}}
+            elif tag == 'meta':
+                if not csrf_found and el.get('name') == 'csrf-token':
+                    csrf_found = True
+                    csrf_token = el.get('content')
+            else:
+                if not (tag == 'input' and el.get('type') in SKIP_INPUT_TYPES):
+                    input_tags.append(tag_html(el))
+                name = el.get('name')
+                if name:
+                    form_data[name] = _option_value(el) if tag == 'select' else el.get('value', 'test_value')
+                    if forms:
+                        for parent in el.iterancestors('form'):
+                            forms[parent]['fields'][name] = form_data[name]
+                            break
+
+    if csrf_found:
+        form_data['csrf_token'] = csrf_token
+        for form in forms.values():
+            form['fields'].setdefault('csrf_token', csrf_token)
+
+    return {
+        'input_tags': input_tags,
+        'form_data': form_data,
+        'csrf_token': csrf_token,
+        'links': links,
+        'forms': list(forms.values()),
+    }
+
+# Scrapy 스파이더용 (amas / crtns / only_crt 공통)
+class InputTag:
+    __slots__ = ('tag', 'type', 'name', 'id', 'value')
+
+    def __init__(self, tag, type, name, id, value):
+        self.tag = tag
+        self.type = type
+        self.name = name
+        self.id = id
+        self.value = value
+
+    def to_dict(self):
+        return {'tag': self.tag, 'type': self.type, 'name': self.name, 'id': self.id, 'value': self.value}
+
+class FormInput:
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def to_dict(self):
+        return {'name': self.name, 'value': self.value}
+
+class Form:
+    __slots__ = ('id', 'action', 'method', 'inputs')
+
+    def __init__(self, id, action, method):
+        self.id = id
+        self.action = action
+        self.method = method
+        self.inputs = []
+
+    def to_dict(self):
+        return {'action': self.action, 'method': self.method, 'inputs': [i.to_dict() for i in self.inputs]}
+
+class PageData:
+    __slots__ = ('url', 'input_tags', 'csrf_token', 'forms', 'cookies')
+
+    def __init__(self, url, input_tags, csrf_token, forms, cookies):
+        self.url = url
+        self.input_tags = input_tags
+        self.csrf_token = csrf_token
+        self.forms = forms
+        self.cookies = cookies
+
+    # 기존 <domain>_analysis.json 형식 (form id가 같으면 뒤의 form이 덮어씀)
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'input_tags': [tag.to_dict() for tag in self.input_tags],
+            'csrf_token': self.csrf_token,
+            'form_data': {form.id: form.to_dict() for form in self.forms},
+            'cookies': self.cookies,
+        }
+
+FIELD_TAGS = ('input', 'textarea', 'select')
+
+# 트리를 한 번만 돌면서 input/form/csrf를 모두 모은다
+# (필드가 속한 form은 조상 노드에서 찾는다)
+def extract_page(root, url, cookies):
+    input_tags = []
+    forms = {}
+    csrf_token = None
+
+    for el in root.iter(*FIELD_TAGS, 'form', 'meta'):
+        tag = el.tag
+        attrib = el.attrib
+        if tag == 'form':
+            forms[el] = Form(attrib.get('id', ''), attrib.get('action', ''), attrib.get('method', 'get'))
+        elif tag == 'meta':
+            if csrf_token is None and attrib.get('name') == 'csrf-token':
+                csrf_token = attrib.get('content')
+        else:
+            input_tags.append(InputTag(tag, attrib.get('type', 'text'), attrib.get('name', ''),
+                                       attrib.get('id', ''), attrib.get('value', '')))
+            if forms and 'name' in attrib:
+                field = FormInput(attrib['name'], attrib.get('value', 'test_value'))
+                for parent in el.iterancestors('form'):
+                    forms[parent].inputs.append(field)
+
+    return PageData(url, input_tags, csrf_token, list(forms.values()), cookies)
+
+def extract_page_data(response):
+    cookies = [cookie.decode() for cookie in response.headers.getlist('Set-Cookie')]
+    return extract_page(response.selector.root, response.url, cookies).to_dict()
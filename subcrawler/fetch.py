@@ -0,0 +1,378 @@
+import asyncio, time
+import aiohttp, requests
+from concurrent.futures import ProcessPoolExecutor
+from .plugins import engine, batch_engine, SINKS
+from .extract import analyze_html
+from .dedup import Deduper
+from .seenset import make_seen_set
+from .probe import Prober
+from .enum_cache import EnumCache
+from .enumeration import enumerate_subdomains
+from .forms import FormProber, AsyncFormProber, DomainForms
+from .limits import BodyLimit
+from .metrics import METRICS
+from .batch import SharedPools, budget
+
+# bs4/sub.py의 페이지 분석 엔진: 서브도메인마다 메인 페이지와 링크 max_links개를 받아 폼을 POST 해 본다
+# 'sync'는 requests로 하나씩, 'async'는 aiohttp로 여러 서브도메인을 동시에
+
+#base_url 아래의 링크만 (https://a.example.com 이 https://a.example.com.evil.net 에 걸리지 않게 경계까지 확인)
+def get_subURLs(hrefs, base_url):
+    prefix = base_url.rstrip('/')
+    end = len(prefix)
+    links = []
+    for full_url in hrefs:
+        if full_url.startswith(prefix) and full_url[end:end + 1] in ('', '/', '?', '#'):
+            links.append(full_url)
+    return links
+
+#페이지 결과를 만들고 폼은 forms(FormProber) 단계로 넘긴다
+#form_probes는 처음에 Future 목록이고 서브도메인 분석이 끝날 때 결과로 바뀐다 (_form_results)
+def page_result(session, url, page, forms=None):
+    if 'duplicate_of' in page:
+        return {"url": url, "duplicate_of": page['duplicate_of']}
+    cookies = dict(session.cookies)
+    probes = [forms.submit(form, url, cookies) for form in page['forms']] if forms else []
+    
+    return {
+        "url": url,
+        "input_tags": page['input_tags'],
+        "cookies": cookies,
+        "csrf_token": page['csrf_token'],
+        "form_data": page['form_data'],
+        "form_probes": probes
+    }
+
+def _form_results(results):
+    for result in results:
+        if 'form_probes' in result:
+            result['form_probes'] = [probe.result() for probe in result['form_probes']]
+    return results
+
+#본문이 이미 분석한 페이지와 같으면 파싱하지 않는다
+#limit(BodyLimit)이 있으면 본문을 스트리밍으로 받아 HTML이 아니면 None, 너무 크면 앞부분만
+def fetch_page(session, url, dedup=None, limit=None):
+    start = time.perf_counter()
+    try:
+        response = session.get(url, timeout=10, stream=limit is not None)
+        with response:
+            METRICS.inc('responses', status=response.status_code)
+            response.raise_for_status()
+            content = limit.read(response) if limit is not None else response.content
+    except requests.RequestException as e:
+        METRICS.inc('fetch_errors', error=type(e).__name__)
+        raise
+    METRICS.observe('fetch_seconds', time.perf_counter() - start, engine='sync')
+    if content is None:
+        return None
+    METRICS.inc('response_bytes', len(content))
+    duplicate_of = dedup.duplicate_of(url, content) if dedup else None
+    if duplicate_of:
+        return {'duplicate_of': duplicate_of}
+    with METRICS.timer('extract_seconds'):
+        return analyze_html(content, url, response.encoding)
+
+def new_links(page, base_url, dedup=None):
+    if 'duplicate_of' in page:
+        return []  # 미러 페이지의 링크는 원본과 같으므로 따라가지 않는다
+    links = get_subURLs(page['links'], base_url)
+    if dedup:
+        dedup.seen_url(base_url)
+        links = [link for link in links if not dedup.seen_url(link)]
+    return links
+
+def analyze_page(session, url, dedup=None, forms=None, limit=None):
+    try:
+        page = fetch_page(session, url, dedup, limit)
+        return page_result(session, url, page, forms) if page is not None else None
+    except requests.Timeout:
+        print(f"Timeout error occurred while accessing {url}")
+        return None
+    except requests.ConnectionError:
+        print(f"Connection error occurred while accessing {url}")
+        return None
+    except requests.RequestException as e:
+        print(f"Error occurred while analyzing {url}: {str(e)}")
+        return None
+
+#origin: probe 단계에서 찾은 scheme://host[:port], 없으면 scheme으로 만든다
+#forms: 폼 제출 단계 (DomainForms / FormProber), 없으면 폼을 보내지 않는다
+#limit: 응답 크기/종류 제한 (BodyLimit), 없으면 본문을 모두 받는다
+def analyze_subdomain(subdomain, scheme='https', dedup=None, origin=None, max_links=5, forms=None, limit=None):
+    session = requests.Session()
+    base_url = origin or f"{scheme}://{subdomain}"
+    try:
+        page = fetch_page(session, base_url, dedup, limit)
+    except requests.RequestException as e:
+        print(f"Error accessing {base_url}: {str(e)}")
+        return None
+    if page is None:
+        print(f"Skipping {base_url}: not HTML")
+        return None
+    links = new_links(page, base_url, dedup)
+    
+    #메인 페이지는 이미 받아서 파싱했으므로 다시 요청하지 않는다
+    results = [page_result(session, base_url, page, forms)]
+    for link in links[:max_links]:
+        result = analyze_page(session, link, dedup, forms, limit)
+        if result:
+            results.append(result)
+    
+    #폼 제출은 그동안 forms 스레드에서 돌았다
+    return _form_results(results)
+
+#aiohttp 버전: 연결 풀은 공유하고 쿠키는 서브도메인마다 따로
+#파싱은 CPU 작업이라 pool(ProcessPoolExecutor)이 있으면 이벤트 루프 밖에서 돌린다
+async def fetch_page_async(session, url, pool=None, dedup=None, limit=None):
+    start = time.perf_counter()
+    try:
+        async with session.get(url) as response:
+            METRICS.inc('responses', status=response.status)
+            response.raise_for_status()
+            content = await limit.read_async(response) if limit is not None else await response.read()
+            encoding = response.charset
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        METRICS.inc('fetch_errors', error=type(e).__name__)
+        raise
+    METRICS.observe('fetch_seconds', time.perf_counter() - start, engine='async')
+    if content is None:
+        return None
+    METRICS.inc('response_bytes', len(content))
+    duplicate_of = dedup.duplicate_of(url, content) if dedup else None
+    if duplicate_of:
+        return {'duplicate_of': duplicate_of}
+    #pool을 쓰면 프로세스로 넘기고 기다리는 시간까지 포함된다
+    with METRICS.timer('extract_seconds'):
+        if pool is None:
+            return analyze_html(content, url, encoding)
+        return await asyncio.get_running_loop().run_in_executor(pool, analyze_html, content, url, encoding)
+
+def page_result_async(session, url, page, forms=None):
+    if 'duplicate_of' in page:
+        return {"url": url, "duplicate_of": page['duplicate_of']}
+    probes = [forms.submit(session, form, url) for form in page['forms']] if forms else []
+    
+    return {
+        "url": url,
+        "input_tags": page['input_tags'],
+        "cookies": {cookie.key: cookie.value for cookie in session.cookie_jar},
+        "csrf_token": page['csrf_token'],
+        "form_data": page['form_data'],
+        "form_probes": probes
+    }
+
+async def _form_results_async(results):
+    for result in results:
+        if 'form_probes' in result:
+            result['form_probes'] = list(await asyncio.gather(*result['form_probes']))
+    return results
+
+async def analyze_page_async(session, url, pool=None, dedup=None, forms=None, limit=None):
+    try:
+        page = await fetch_page_async(session, url, pool, dedup, limit)
+        return page_result_async(session, url, page, forms) if page is not None else None
+    except asyncio.TimeoutError:
+        print(f"Timeout error occurred while accessing {url}")
+        return None
+    except aiohttp.ClientConnectionError:
+        print(f"Connection error occurred while accessing {url}")
+        return None
+    except aiohttp.ClientError as e:
+        print(f"Error occurred while analyzing {url}: {str(e)}")
+        return None
+
+async def analyze_subdomain_async(connector, subdomain, timeout, scheme='https', pool=None, dedup=None, origin=None,
+                                  max_links=5, forms=None, limit=None):
+    base_url = origin or f"{scheme}://{subdomain}"
+    async with aiohttp.ClientSession(connector=connector, connector_owner=False, timeout=timeout,
+                                     cookie_jar=aiohttp.CookieJar(unsafe=True), trust_env=True) as session:
+        try:
+            page = await fetch_page_async(session, base_url, pool, dedup, limit)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error accessing {base_url}: {str(e)}")
+            return None
+        if page is None:
+            print(f"Skipping {base_url}: not HTML")
+            return None
+        links = new_links(page, base_url, dedup)
+        
+        results = [page_result_async(session, base_url, page, forms)]
+        pages = await asyncio.gather(*(analyze_page_async(session, link, pool, dedup, forms, limit)
+                                       for link in links[:max_links]))
+        results.extend(result for result in pages if result)
+        
+        #세션(쿠키)을 닫기 전에 이 서브도메인의 폼 제출이 끝나기를 기다린다
+        return await _form_results_async(results)
+
+#concurrency: 전체 동시 연결 수, per_host: 호스트당 동시 연결 수, timeout: 요청당 제한시간(초)
+#parse_workers: 파싱 프로세스 수 (0이면 이벤트 루프에서 직접 파싱), origins: {서브도메인: probe로 찾은 origin}
+#forms: 폼 제출 단계 (AsyncFormProber), 없으면 폼을 보내지 않는다, limit: 응답 크기/종류 제한 (BodyLimit)
+async def analyze_all_async(subdomains, on_result, concurrency=50, per_host=4, timeout=10, scheme='https',
+                            parse_workers=None, dedup=None, origins=None, max_links=5, connector=None, pool=None,
+                            forms=None, limit=None):
+    #connector/pool을 받으면 여러 도메인이 같은 연결 풀과 파싱 프로세스를 쓰고, 닫는 것은 호출한 쪽이 한다
+    owner = connector is None
+    if owner:
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, keepalive_timeout=30)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    owns_pool = pool is None and parse_workers != 0
+    if owns_pool:
+        pool = ProcessPoolExecutor(max_workers=parse_workers)
+    pending = iter(subdomains)
+    
+    async def worker():
+        for subdomain in pending:
+            print(f"\nAnalyzing {subdomain}...")
+            origin = origins.get(subdomain) if origins else None
+            analysis = await analyze_subdomain_async(connector, subdomain, client_timeout, scheme, pool, dedup, origin,
+                                                     max_links, forms, limit)
+            if analysis:
+                on_result(subdomain, analysis)
+    
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        if owner:
+            await connector.close()
+        if owns_pool:
+            pool.shutdown()
+
+# 열거 결과를 모은 뒤 (probe로 살아 있는 origin만 남기고) 분석한다
+# source_options/connector: batch 모드에서 도메인끼리 같이 쓰는 DNS resolver와 probe 연결 풀
+async def _collect(domain, options, cache, source_options=None, connector=None):
+    hosts = enumerate_subdomains(domain, options['sources'], source_options or options['source_options'], cache,
+                                 options['refresh'], include=(domain,))
+    if not options['probe']:
+        origins = {host: None async for host in hosts}
+    else:
+        #죽은 호스트와 같은 곳으로 리다이렉트되는 호스트는 여기서 걸러진다
+        prober = Prober(domain, concurrency=options['concurrency'], timeout=options['timeout'], connector=connector)
+        origins = await prober.probe_all(hosts)
+        print(prober.summary())
+    print("Found subdomains:", len(origins), "WOW")
+    for subdomain in origins:
+        print(subdomain)
+    return origins
+
+def _targets(domain, options):
+    return asyncio.run(_collect(domain, options, EnumCache()))
+
+def _outputs(domain, options):
+    sink = SINKS[options['sink']](domain, pages_key=None)
+    def save(subdomain, analysis):
+        for page in analysis:
+            sink.write(subdomain, page)
+
+    dedup = Deduper(make_seen_set(options['seen'], f"{domain}.seen.sqlite3"))
+    return sink, dedup, save
+
+def _close_outputs(sink, dedup):
+    sink.close()
+    dedup.close()
+    print(dedup.summary())
+    print(f"\nAnalysis complete. Results saved to {getattr(sink, 'json_path', sink.path)}")
+
+def _run(domain, options, analyze):
+    origins = _targets(domain, options)
+    sink, dedup, save = _outputs(domain, options)
+    analyze(origins, save, dedup)
+    _close_outputs(sink, dedup)
+
+#--form-concurrency 0 이면 폼을 보내지 않는다
+def _form_prober(options, cls=FormProber):
+    if not options['form_concurrency']:
+        return None
+    if cls is FormProber:
+        return FormProber(options['form_concurrency'], options['form_rate'], options['timeout'])
+    return cls(options['form_concurrency'], options['form_rate'])
+
+#도메인 밖으로 가는 폼은 보내지 않는다
+def _domain_forms(forms, domain):
+    return DomainForms(forms, domain) if forms is not None else None
+
+def _body_limit(options):
+    return BodyLimit(options['max_bytes'], html_only=not options['all_types'])
+
+@engine('sync')
+def run_sync(domain, options):
+    def analyze(origins, save, dedup):
+        forms = _form_prober(options)
+        scoped = _domain_forms(forms, domain)
+        limit = _body_limit(options)
+        try:
+            for subdomain, origin in origins.items():
+                print(f"\nAnalyzing {subdomain}...")
+                analysis = analyze_subdomain(subdomain, options['schemes'][0], dedup, origin, options['max_links'], scoped,
+                                             limit)
+                if analysis:
+                    save(subdomain, analysis)
+        finally:
+            if forms is not None:
+                forms.close()
+                print(forms.summary())
+            print(limit.summary())
+    _run(domain, options, analyze)
+
+@engine('async')
+def run_async(domain, options):
+    def analyze(origins, save, dedup):
+        async def run():
+            forms = _form_prober(options, AsyncFormProber)
+            limit = _body_limit(options)
+            await analyze_all_async(list(origins), save, options['concurrency'], options['per_host'],
+                                    options['timeout'], options['schemes'][0], options['parse_workers'], dedup,
+                                    origins, options['max_links'], forms=_domain_forms(forms, domain), limit=limit)
+            if forms is not None:
+                print(forms.summary())
+            print(limit.summary())
+        asyncio.run(run())
+    _run(domain, options, analyze)
+
+# --targets: 이벤트 루프 하나에서 도메인 G // P개를 동시에, 도메인마다 worker P개
+# HTTP 연결 풀(전체 --global-concurrency, 호스트당 --per-host), 파싱 프로세스 풀, 열거 캐시,
+# DNS resolver와 probe 연결 풀은 모든 도메인이 같이 쓴다
+@batch_engine('async')
+def run_async_batch(domains, options, progress):
+    parallel, per_domain = budget(options, domains)
+
+    async def run():
+        connector = aiohttp.TCPConnector(limit=options['global_concurrency'], limit_per_host=options['per_host'],
+                                         keepalive_timeout=30)
+        pool = ProcessPoolExecutor(max_workers=options['parse_workers']) if options['parse_workers'] != 0 else None
+        pools = SharedPools(options)
+        cache = EnumCache()
+        forms = _form_prober(options, AsyncFormProber)  # 폼 제출 예산과 시그니처 중복 제거도 전체 공유
+        limit = _body_limit(options)
+        slots = asyncio.Semaphore(parallel)
+
+        async def scan(domain):
+            async with slots:
+                progress.start(domain)
+                try:
+                    origins = await _collect(domain, options, cache, pools.source_options, pools.probe_connector)
+                    sink, dedup, save = _outputs(domain, options)
+                    try:
+                        await analyze_all_async(list(origins), save, per_domain, options['per_host'],
+                                                options['timeout'], options['schemes'][0], dedup=dedup,
+                                                origins=origins, max_links=options['max_links'],
+                                                connector=connector, pool=pool, forms=_domain_forms(forms, domain),
+                                                limit=limit)
+                    finally:
+                        _close_outputs(sink, dedup)
+                except Exception as e:
+                    print(f"[batch] {domain}: {type(e).__name__}: {e}")
+                    progress.finish(domain, 'failed')
+                else:
+                    progress.finish(domain)
+
+        try:
+            await asyncio.gather(*(scan(domain) for domain in domains))
+            print(limit.summary())
+        finally:
+            await pools.close()
+            await connector.close()
+            cache.close()
+            if pool is not None:
+                pool.shutdown()
+
+    asyncio.run(run())
@@ -0,0 +1,172 @@
+import asyncio, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor
+import aiohttp, requests
+from .dedup import canonicalize_url
+from .resolver import RateLimiter
+from .scope import scope_for
+from .metrics import METRICS
+
+# 폼 제출 probe 단계 (sync / async 엔진)
+# 페이지 GET과 분리해서 자체 동시성(concurrency)과 초당 제출 수(rate) 안에서 돈다
+# 각 폼의 action / method로 보내고, (method, action, 필드 이름)이 같은 폼은 실행 전체에서 한 번만 보낸다
+# 결과: 처음 보낸 페이지에는 응답 앞부분(max_body자), 같은 폼이 있는 다른 페이지에는 probed_on(처음 페이지 URL)
+# action이 크롤링 도메인 밖(SSO, 결제, 분석 서비스 등)이면 보내지 않고 skipped로 남긴다 (DomainForms)
+
+def form_signature(form):
+    return form['method'], canonicalize_url(form['action']), tuple(sorted(form['fields']))
+
+def _request_args(form):
+    data = {name: value for name, value in form['fields'].items() if value is not None}
+    return {'params': data} if form['method'] == 'GET' else {'data': data}
+
+def _summary(form):
+    return {'action': form['action'], 'method': form['method'], 'fields': sorted(form['fields'])}
+
+def _done(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+def _done_async(result):
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(result)
+    return future
+
+class _Budget:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next - now)
+            self._next = max(now, self._next) + self.interval
+        if delay:
+            time.sleep(delay)
+
+class _Signatures:
+    def __init__(self):
+        self.first = {}  # signature -> 처음 본 페이지 URL
+        self.sent = 0
+        self.duplicates = 0
+        self.out_of_scope = 0
+
+    # 범위 안이면 None, 밖이면 보내지 않은 결과
+    def check_scope(self, form, scope):
+        if scope is None or scope.url_in_scope(form['action']):
+            return None
+        self.out_of_scope += 1
+        METRICS.inc('form_probes', result='out_of_scope')
+        return dict(_summary(form), skipped='out of scope')
+
+    # 처음 보는 폼이면 None, 아니면 처음 본 페이지 URL
+    def claim(self, form, page_url):
+        signature = form_signature(form)
+        first = self.first.get(signature)
+        if first is None:
+            self.first[signature] = page_url
+            self.sent += 1
+            return None
+        self.duplicates += 1
+        METRICS.inc('form_probes', result='duplicate')
+        return first
+
+    def summary(self):
+        return (f"Forms: {self.sent} probed, {self.duplicates} duplicate forms skipped, "
+                f"{self.out_of_scope} out-of-scope actions not sent")
+
+# requests 버전: 스레드 concurrency개가 제출하고, submit은 바로 Future를 돌려준다
+class FormProber(_Signatures):
+    def __init__(self, concurrency=4, rate=5, timeout=10, max_body=500):
+        super().__init__()
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='form-probe')
+        self.budget = _Budget(rate)
+        self.timeout = timeout
+        self.max_body = max_body
+        self._local = threading.local()
+
+    def submit(self, form, page_url, cookies=None, scope=None):
+        skipped = self.check_scope(form, scope)
+        if skipped is not None:
+            return _done(skipped)
+        first = self.claim(form, page_url)
+        if first is None:
+            return self.pool.submit(self._send, form, dict(cookies or {}))
+        return _done(dict(_summary(form), probed_on=first))
+
+    def _send(self, form, cookies):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        result = _summary(form)
+        self.budget.wait()
+        start = time.perf_counter()
+        try:
+            response = session.request(form['method'], form['action'], cookies=cookies, timeout=self.timeout,
+                                       stream=True, **_request_args(form))
+            with response:
+                result['status'] = response.status_code
+                body = next(response.iter_content(self.max_body * 4, decode_unicode=False), b'')
+                result['response'] = body.decode(response.encoding or 'utf-8', errors='replace')[:self.max_body]
+            METRICS.inc('form_probes', result='sent')
+        except requests.RequestException as e:
+            result['error'] = str(e)
+            METRICS.inc('form_probes', result='error')
+        METRICS.observe('form_probe_seconds', time.perf_counter() - start, method=form['method'])
+        return result
+
+    def close(self):
+        self.pool.shutdown()
+
+# aiohttp 버전: 페이지의 세션(쿠키)으로 보내고 task를 돌려준다
+class AsyncFormProber(_Signatures):
+    def __init__(self, concurrency=4, rate=5, max_body=500):
+        super().__init__()
+        self.slots = asyncio.Semaphore(concurrency)
+        self.limiter = RateLimiter(rate)
+        self.max_body = max_body
+
+    def submit(self, session, form, page_url, scope=None):
+        skipped = self.check_scope(form, scope)
+        if skipped is not None:
+            return _done_async(skipped)
+        first = self.claim(form, page_url)
+        if first is not None:
+            return _done_async(dict(_summary(form), probed_on=first))
+        return asyncio.ensure_future(self._send(session, form))
+
+    async def _send(self, session, form):
+        result = _summary(form)
+        async with self.slots:
+            await self.limiter.wait()
+            start = time.perf_counter()
+            try:
+                async with session.request(form['method'], form['action'], **_request_args(form)) as response:
+                    result['status'] = response.status
+                    body = b''
+                    while len(body) < self.max_body * 4:
+                        chunk = await response.content.read(self.max_body * 4 - len(body))
+                        if not chunk:
+                            break
+                        body += chunk
+                    result['response'] = body.decode(response.charset or 'utf-8', errors='replace')[:self.max_body]
+                METRICS.inc('form_probes', result='sent')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                result['error'] = str(e)
+                METRICS.inc('form_probes', result='error')
+            METRICS.observe('form_probe_seconds', time.perf_counter() - start, method=form['method'])
+        return result
+
+# 도메인 하나에서 쓰는 폼 제출 창구: 제출 예산과 시그니처 중복 제거는 prober를 같이 쓰고 (batch 모드에서 도메인끼리 공유)
+# action이 scope_for(domain) 밖인 폼은 보내지 않는다
+class DomainForms:
+    def __init__(self, prober, domain):
+        self.prober = prober
+        self.scope = scope_for(domain)
+
+    def submit(self, *args):
+        return self.prober.submit(*args, scope=self.scope)
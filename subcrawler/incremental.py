@@ -0,0 +1,158 @@
+import json, sqlite3
+from .dedup import fingerprint
+from .sink import JsonSink, JsonlSink
+from .metrics import METRICS
+
+# 같은 도메인을 다시 스캔할 때 (--incremental)
+# URL마다 ETag / Last-Modified / 본문 해시 / 추출 결과 / 링크를 <output>.rescan.sqlite3 에 남겨 두고 다음 스캔에서
+#   - 조건부 요청(If-None-Match / If-Modified-Since)이 304면 저장된 결과와 링크를 그대로 쓰고
+#   - 200이어도 본문 해시가 같으면 추출을 건너뛰고
+#   - 새로 생기거나, 없어지거나, form/input이 바뀐 페이지를 <output>_diff.json 에 기록한다
+# 첫 스캔은 기준점만 만들고 diff는 쓰지 않는다
+class RescanIndex:
+    def __init__(self, output, resume=False, json_diff=True, batch_size=200):
+        self.path = f"{output}.rescan.sqlite3"
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY, key TEXT, etag TEXT, last_modified TEXT, hash BLOB, size INTEGER,
+                record TEXT, links TEXT, scan INTEGER);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+        ''')
+        last = self._get('scan', 0)
+        # 중단된 스캔을 --resume으로 이어 가면 같은 스캔 번호를 쓴다
+        self.scan = last if resume and self._get('running', 0) else last + 1
+        self.baseline = self.db.execute('SELECT 1 FROM pages WHERE scan < ? LIMIT 1', (self.scan,)).fetchone() is None
+        self._set('scan', self.scan)
+        self._set('running', 1)
+        self.db.commit()
+        self.batch_size = int(batch_size)
+        self._pending = 0
+        append = resume and self.scan == last
+        diff_path = f"{output}_diff.jsonl"
+        if json_diff:
+            self.diff = JsonSink(diff_path, f"{output}_diff.json", pages_key=None, append=append)
+        else:
+            self.diff = JsonlSink(diff_path, append=append)
+        self.counts = {'not_modified': 0, 'unchanged': 0, 'changed': 0, 'new': 0, 'removed': 0}
+
+    def _get(self, key, default=None):
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set(self, key, value):
+        self.db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, value))
+
+    def _lookup(self, url):
+        return self.db.execute('SELECT key, etag, last_modified, hash, size, record, links FROM pages WHERE url = ?',
+                               (url,)).fetchone()
+
+    # 지난 스캔에서 받은 검증자로 조건부 요청 헤더를 만든다
+    def headers(self, url):
+        row = self.db.execute('SELECT etag, last_modified FROM pages WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return {}
+        headers = {}
+        if row[0]:
+            headers['If-None-Match'] = row[0]
+        if row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def _touch(self, url, etag=None, last_modified=None):
+        self.db.execute('UPDATE pages SET scan = ?, etag = coalesce(?, etag), last_modified = coalesce(?, last_modified) '
+                        'WHERE url = ?', (self.scan, etag, last_modified, url))
+        self._written()
+
+    # 304: (key, record, links) 저장된 그대로
+    def not_modified(self, url):
+        row = self._lookup(url)
+        if row is None:
+            return None
+        self._touch(url)
+        self._count('not_modified')
+        METRICS.inc('rescan_avoided_bytes', row[4] or 0)
+        return row[0], json.loads(row[5]), json.loads(row[6])
+
+    # 조건부 요청을 무시하는 서버: 본문 해시가 같으면 저장된 결과를 쓴다
+    def unchanged(self, url, body, etag=None, last_modified=None):
+        row = self._lookup(url)
+        if row is None or row[3] != fingerprint(body):
+            return None
+        self._touch(url, etag, last_modified)
+        self._count('unchanged')
+        return row[0], json.loads(row[5]), json.loads(row[6])
+
+    def store(self, url, key, body, record, links, etag=None, last_modified=None):
+        row = self._lookup(url)
+        if row is None:
+            self._count('new')
+            if not self.baseline:
+                self.diff.write('new', dict(url=url, **signatures(record)))
+        else:
+            self._count('changed')
+            changes = diff_signatures(signatures(json.loads(row[5])), signatures(record))
+            if changes:
+                self.diff.write('changed', dict(url=url, **changes))
+        self.db.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (url, key, etag, last_modified, fingerprint(body), len(body),
+                         json.dumps(record, ensure_ascii=False), json.dumps(list(links)), self.scan))
+        self._written()
+
+    def _count(self, result):
+        self.counts[result] += 1
+        METRICS.inc('rescan_pages', result=result)
+
+    def _written(self):
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.db.commit()
+        self._pending = 0
+        self.diff.flush()
+
+    # 이번 스캔에서 한 번도 받지 못한 URL은 없어진 페이지
+    def finish(self):
+        for url, record in self.db.execute('SELECT url, record FROM pages WHERE scan < ?', (self.scan,)):
+            self._count('removed')
+            self.diff.write('removed', dict(url=url, **signatures(json.loads(record))))
+        self.db.execute('DELETE FROM pages WHERE scan < ?', (self.scan,))
+        self._set('running', 0)
+
+    def summary(self):
+        counts = self.counts
+        return (f"Rescan #{self.scan}{' (baseline)' if self.baseline else ''}: {counts['not_modified']} not modified, "
+                f"{counts['unchanged']} unchanged, {counts['changed']} changed, {counts['new']} new, "
+                f"{counts['removed']} removed")
+
+    def close(self, finished=True):
+        if finished:
+            self.finish()
+        self.flush()
+        self.db.close()
+        self.diff.close()
+
+# form은 method + action + 필드 이름, input은 type + name 으로 비교
+# (Scrapy 스파이더 형식과 sync/async 엔진 형식 둘 다)
+def signatures(record):
+    form_data = record.get('form_data') or {}
+    if all(isinstance(form, dict) and 'inputs' in form for form in form_data.values()):
+        forms = {f"{form['method'].upper()} {form['action']} ({', '.join(sorted(i['name'] for i in form['inputs']))})"
+                 for form in form_data.values()}
+    else:
+        forms = {f"({', '.join(sorted(form_data))})"} if form_data else set()
+    inputs = {tag if isinstance(tag, str) else f"{tag['type']} {tag['name']}" for tag in record.get('input_tags') or ()}
+    return {'forms': sorted(forms), 'inputs': sorted(inputs)}
+
+def diff_signatures(old, new):
+    changes = {}
+    for name in ('forms', 'inputs'):
+        added = sorted(set(new[name]) - set(old[name]))
+        removed = sorted(set(old[name]) - set(new[name]))
+        if added:
+            changes[f'{name}_added'] = added
+        if removed:
+            changes[f'{name}_removed'] = removed
+    return changes
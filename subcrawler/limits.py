@@ -0,0 +1,94 @@
+import threading
+from urllib.parse import urlsplit
+from .metrics import METRICS
+
+# 응답 본문 크기 / 종류 제한 (scrapy, sync, async 엔진 공통)
+#   - Content-Type이 HTML이 아니면 헤더만 보고 본문을 받지 않는다 (헤더가 없으면 받는다)
+#   - HTML이라도 max_bytes까지만 받고 연결을 끊는다 (앞부분만 분석)
+# 받지 않은 바이트는 Content-Length로 계산해서 호스트마다 모은다 (길이를 모르면 응답 수만)
+MAX_BYTES = 2 * 2**20
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+CHUNK_SIZE = 64 * 1024
+
+def _length(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+class BodyLimit:
+    def __init__(self, max_bytes=MAX_BYTES, html_only=True):
+        self.max_bytes = int(max_bytes or 0)  # 0이면 제한 없음
+        self.html_only = html_only
+        self.hosts = {}  # host -> [응답 수, 받지 않은 바이트]
+        self._lock = threading.Lock()
+
+    def skip_type(self, content_type):
+        if not self.html_only or not content_type:
+            return False
+        return content_type.split(';', 1)[0].strip().lower() not in HTML_TYPES
+
+    def too_big(self, received):
+        return bool(self.max_bytes) and received > self.max_bytes
+
+    # reason: content_type(받지 않음) / max_bytes(잘림), length: Content-Length, received: 그때까지 받은 바이트
+    def avoided(self, url, reason, length=None, received=0):
+        length = _length(length)
+        avoided = max(0, length - received) if length is not None and length >= 0 else 0
+        METRICS.inc('limited_responses', reason=reason)
+        METRICS.inc('avoided_bytes', avoided, reason=reason)
+        with self._lock:
+            entry = self.hosts.setdefault(urlsplit(url).hostname, [0, 0])
+            entry[0] += 1
+            entry[1] += avoided
+
+    # requests 응답 (stream=True): 건너뛰면 None, 넘치면 max_bytes까지
+    def read(self, response):
+        if self.skip_type(response.headers.get('Content-Type')):
+            self.avoided(response.url, 'content_type', response.headers.get('Content-Length'))
+            return None
+        if not self.max_bytes:
+            return response.content
+        body = bytearray()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            body += chunk
+            if self.too_big(len(body)):
+                # Content-Length는 전송 바이트라서 압축된 응답이면 받은 양도 전송 바이트로 센다
+                received = response.raw.tell() if hasattr(response.raw, 'tell') else len(body)
+                self.avoided(response.url, 'max_bytes', response.headers.get('Content-Length'), received)
+                return bytes(body[:self.max_bytes])
+        return bytes(body)
+
+    # aiohttp 응답: read()와 같음, 넘치면 연결을 닫는다
+    async def read_async(self, response):
+        url = str(response.url)
+        if self.skip_type(response.headers.get('Content-Type')):
+            self.avoided(url, 'content_type', response.headers.get('Content-Length'))
+            response.close()
+            return None
+        if not self.max_bytes:
+            return await response.read()
+        body = bytearray()
+        while True:
+            chunk = await response.content.read(CHUNK_SIZE)
+            if not chunk:
+                return bytes(body)
+            body += chunk
+            if self.too_big(len(body)):
+                self.avoided(url, 'max_bytes', response.headers.get('Content-Length'), len(body))
+                response.close()
+                return bytes(body[:self.max_bytes])
+
+    def summary(self, top=10):
+        with self._lock:
+            hosts = sorted(self.hosts.items(), key=lambda item: -item[1][1])
+        if not hosts:
+            return "Size limits: nothing skipped or truncated"
+        responses = sum(count for _, (count, _) in hosts)
+        avoided = sum(size for _, (_, size) in hosts)
+        lines = [f"Size limits: {responses} responses skipped or truncated, {avoided / 2**20:.1f} MiB not downloaded"]
+        for host, (count, size) in hosts[:top]:
+            lines.append(f"  {host}: {count} responses, {size / 2**20:.1f} MiB")
+        if len(hosts) > top:
+            lines.append(f"  ... {len(hosts) - top} more hosts")
+        return '\n'.join(lines)
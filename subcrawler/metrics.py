@@ -0,0 +1,235 @@
+import bisect, threading, time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 크롤링 단계별 계측: 지연 히스토그램, 카운터, 게이지
+# 열거/probe 스레드와 reactor 스레드에서 같이 쓰므로 lock으로 보호
+# 이름은 모두 subcrawler_ 접두사가 붙어서 OpenMetrics 텍스트로 나간다
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PREFIX = 'subcrawler_'
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+def _labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _size(value):
+    return f"{value / 2**20:.1f} MiB" if value >= 2**20 else f"{value / 2**10:.1f} KiB"
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    # 버킷 안에서는 선형 보간 (Prometheus histogram_quantile과 같은 방식)
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}    # name -> {labels: value}
+        self.gauges = {}      # name -> {labels: value 또는 callable}
+        self.histograms = {}  # name -> {labels: Histogram}
+        self.help = {}
+        self.started = time.time()
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            key = _key(labels)
+            series[key] = series.get(key, 0) + value
+
+    # value가 callable이면 읽을 때마다 호출 (큐 길이 등)
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges.setdefault(name, {})[_key(labels)] = value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            key = _key(labels)
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def value(self, name, **labels):
+        return self.counters.get(name, {}).get(_key(labels), 0)
+
+    def total(self, name):
+        return sum(self.counters.get(name, {}).values())
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    def _gauge_value(self, value):
+        try:
+            return value() if callable(value) else value
+        except Exception:
+            return float('nan')  # 이미 닫힌 scheduler 등
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                self._header(lines, name, 'counter')
+                for key, value in series.items():
+                    lines.append(f"{PREFIX}{name}_total{_labels(key)} {_number(value)}")
+            for name, series in sorted(self.gauges.items()):
+                self._header(lines, name, 'gauge')
+                for key, value in series.items():
+                    lines.append(f"{PREFIX}{name}{_labels(key)} {_number(self._gauge_value(value))}")
+            for name, series in sorted(self.histograms.items()):
+                self._header(lines, name, 'histogram')
+                for key, hist in series.items():
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets + ('+Inf',), hist.counts):
+                        cumulative += count
+                        lines.append(f"{PREFIX}{name}_bucket{_labels(key, [('le', bound)])} {cumulative}")
+                    lines.append(f"{PREFIX}{name}_count{_labels(key)} {hist.count}")
+                    lines.append(f"{PREFIX}{name}_sum{_labels(key)} {_number(hist.sum)}")
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def _header(self, lines, name, kind):
+        lines.append(f"# TYPE {PREFIX}{name} {kind}")
+        if name in self.help:
+            lines.append(f"# HELP {PREFIX}{name} {self.help[name]}")
+
+    # 실행이 끝나고 보여줄 요약: 단계별 시간, 처리량, 전송량
+    def summary(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        lines = [f"Crawl metrics ({elapsed:.1f}s wall):"]
+        with self._lock:
+            if self.histograms:
+                lines.append(f"  {'stage':<40}{'count':>8}{'total s':>10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+            for name, series in sorted(self.histograms.items()):
+                for key, hist in sorted(series.items()):
+                    label = name + _labels(key)
+                    mean = hist.sum / hist.count if hist.count else 0.0
+                    lines.append(f"  {label:<40}{hist.count:>8}{hist.sum:>10.2f}{mean * 1000:>10.1f}"
+                                 f"{hist.quantile(0.5) * 1000:>10.1f}{hist.quantile(0.99) * 1000:>10.1f}")
+            for name, series in sorted(self.counters.items()):
+                for key, value in sorted(series.items()):
+                    label = name + _labels(key)
+                    if name.endswith('bytes'):
+                        lines.append(f"  {label:<40}{_size(value):>14} ({_size(value / elapsed)}/s)")
+                    else:
+                        lines.append(f"  {label:<40}{value:>10} ({value / elapsed:.1f}/s)")
+        return '\n'.join(lines)
+
+METRICS = Metrics()
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/openmetrics-text; version=1.0.0; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+# 로컬 /metrics 엔드포인트 (Prometheus가 긁어 가거나 curl로 확인)
+class MetricsServer:
+    def __init__(self, port=9410, host='127.0.0.1', metrics=METRICS):
+        self.server = ThreadingHTTPServer((host, int(port)), _Handler)
+        self.server.daemon_threads = True
+        self.server.metrics = metrics
+        self.url = f"http://{host}:{self.server.server_address[1]}/metrics"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name='metrics-server', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+# 핫패스 분석용 프로파일 캡처: cprofile(표준 라이브러리) / pyinstrument(설치되어 있을 때)
+# 둘 다 이 함수를 호출한 스레드(reactor / 이벤트 루프)만 본다
+@contextmanager
+def profiled(mode, path=None):
+    if not mode:
+        yield
+        return
+    if mode == 'cprofile':
+        import cProfile, pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            path = path or 'subcrawler.prof'
+            profiler.dump_stats(path)
+            print(f"cProfile stats saved to {path} (python -m pstats {path})")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+    elif mode == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise SystemExit("pyinstrument is not installed (pip install pyinstrument)")
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            path = path or 'subcrawler.profile.html'
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+            print(f"pyinstrument report saved to {path}")
+            print(profiler.output_text(unicode=True))
+    else:
+        raise ValueError(f"Unknown profile mode {mode!r}, available: cprofile, pyinstrument")
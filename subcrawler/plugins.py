@@ -0,0 +1,54 @@
+import importlib
+
+# 플러그인 레지스트리: 이름 -> 구현
+# ENUMERATORS: async generator (domain, **options) -> 호스트 이름
+# ENGINES:     run(domain, options) -> 크롤링 실행 (options는 CLI 옵션 dict)
+# BATCH_ENGINES: run(domains, options, progress) -> --targets 목록을 한 프로세스에서 (없으면 ENGINES를 차례로)
+# SINKS:       factory(domain, append=False, pages_key='pages') -> write(key, record) / flush() / close(finished=True)
+ENUMERATORS = {}
+CACHEABLE = set()  # 결과를 enum_cache에 저장할 enumerator
+CACHE_OPTIONS = {} # enumerator -> 결과를 바꾸는 옵션 이름 (캐시 키에 들어간다, 예: crtsh:expired)
+FEEDBACK = set()   # 다른 소스가 찾은 호스트를 found=(Found)로 받는 enumerator
+ENGINES = {}
+BATCH_ENGINES = {}
+SINKS = {}
+
+def enumerator(name, cacheable=False, feedback=False, cache_options=()):
+    def register(func):
+        ENUMERATORS[name] = func
+        if cacheable:
+            CACHEABLE.add(name)
+            CACHE_OPTIONS[name] = tuple(cache_options)
+        if feedback:
+            FEEDBACK.add(name)
+        return func
+    return register
+
+def engine(name):
+    def register(func):
+        ENGINES[name] = func
+        return func
+    return register
+
+def batch_engine(name):
+    def register(func):
+        BATCH_ENGINES[name] = func
+        return func
+    return register
+
+def sink(name):
+    def register(func):
+        SINKS[name] = func
+        return func
+    return register
+
+# 외부 플러그인 모듈은 import 되는 시점에 위 데코레이터로 자기 자신을 등록한다
+def load_plugins(modules):
+    for module in modules:
+        importlib.import_module(module)
+
+def lookup(registry, kind, name):
+    try:
+        return registry[name]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} {name!r}, available: {', '.join(sorted(registry))}") from None
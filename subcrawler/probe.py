@@ -0,0 +1,126 @@
+import asyncio
+from urllib.parse import urlsplit
+import aiohttp
+from .metrics import METRICS
+from .scope import scope_for
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def origin_of(url):
+    parts = urlsplit(str(url))
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    port = parts.port
+    return f"{scheme}://{host}" if port in (None, DEFAULT_PORTS.get(scheme)) else f"{scheme}://{host}:{port}"
+
+# 본 크롤링 전에 호스트마다 https/http를 HEAD로 가볍게 확인하고
+# 리다이렉트를 따라간 최종 origin(scheme://host[:port])을 한 번씩만 넘긴다
+#   - 응답이 오면 상태 코드와 관계없이 살아 있는 것으로 본다 (HEAD를 막으면 GET으로 다시, 본문은 읽지 않음)
+#   - 두 scheme 모두 살아 있으면 schemes 순서대로 (기본 https 우선)
+#   - domain이 있으면 범위 밖으로 리다이렉트되는 호스트는 버린다
+#   - ports: 테스트용으로 scheme별 포트를 바꿀 때 ({'http': 8080, 'https': 8443})
+#   - connector: 여러 도메인이 연결 풀을 같이 쓸 때 (batch 모드, 같은 이벤트 루프에서 만든 TCPConnector)
+class Prober:
+    def __init__(self, domain=None, concurrency=50, timeout=5, connect_timeout=3, schemes=('https', 'http'),
+                 max_redirects=5, ports=None, connector=None):
+        self.domain = domain
+        self.concurrency = int(concurrency)
+        self.timeout = aiohttp.ClientTimeout(total=float(timeout), sock_connect=float(connect_timeout))
+        self.schemes = tuple(schemes)
+        self.max_redirects = max_redirects
+        self.ports = ports or {}
+        self.connector = connector
+        self.probed = 0
+        self.dead = 0
+        self.duplicates = 0
+
+    def url(self, host, scheme):
+        port = self.ports.get(scheme)
+        return f"{scheme}://{host}:{port}/" if port else f"{scheme}://{host}/"
+
+    def in_scope(self, host):
+        return self.domain is None or bool(host) and scope_for(self.domain).contains(host.rstrip('.'))
+
+    async def probe_url(self, session, url):
+        try:
+            async with session.head(url, allow_redirects=True, max_redirects=self.max_redirects) as response:
+                if response.status not in (405, 501):
+                    return origin_of(response.url)
+            async with session.get(url, allow_redirects=True, max_redirects=self.max_redirects) as response:
+                return origin_of(response.url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+
+    async def probe(self, session, host):
+        origins = await asyncio.gather(*(self.probe_url(session, self.url(host, scheme)) for scheme in self.schemes))
+        for origin in origins:
+            if origin and self.in_scope(urlsplit(origin).hostname):
+                return origin
+        return None
+
+    # hosts는 일반 iterable 또는 async iterable (enumerate_subdomains를 그대로 넘겨도 된다)
+    # 살아 있는 (host, origin)을 확인되는 즉시 내보내고, 같은 origin은 처음 한 번만
+    async def probe_iter(self, hosts):
+        inbox = asyncio.Queue(maxsize=self.concurrency)
+        outbox = asyncio.Queue(maxsize=self.concurrency)
+        seen = set()
+        METRICS.set('probe_queue_depth', inbox.qsize)
+
+        async def feed():
+            try:
+                if hasattr(hosts, '__aiter__'):
+                    async for host in hosts:
+                        await inbox.put(host)
+                else:
+                    for host in hosts:
+                        await inbox.put(host)
+            finally:
+                for _ in range(self.concurrency):
+                    await inbox.put(None)
+
+        async def worker(session):
+            try:
+                while True:
+                    host = await inbox.get()
+                    if host is None:
+                        break
+                    with METRICS.timer('probe_seconds'):
+                        origin = await self.probe(session, host)
+                    self.probed += 1
+                    if origin is None:
+                        self.dead += 1
+                        METRICS.inc('probed_hosts', result='dead')
+                    elif origin in seen:
+                        self.duplicates += 1
+                        METRICS.inc('probed_hosts', result='duplicate')
+                    else:
+                        METRICS.inc('probed_hosts', result='live')
+                        seen.add(origin)
+                        await outbox.put((host, origin))
+            finally:
+                await outbox.put(None)
+
+        connector = self.connector or aiohttp.TCPConnector(limit=self.concurrency, ssl=False)
+        async with aiohttp.ClientSession(connector=connector, connector_owner=self.connector is None,
+                                         timeout=self.timeout, trust_env=True) as session:
+            tasks = [asyncio.ensure_future(feed())]
+            tasks += [asyncio.ensure_future(worker(session)) for _ in range(self.concurrency)]
+            try:
+                remaining = self.concurrency
+                while remaining:
+                    item = await outbox.get()
+                    if item is None:
+                        remaining -= 1
+                    else:
+                        yield item
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def probe_all(self, hosts):
+        return {host: origin async for host, origin in self.probe_iter(hosts)}
+
+    def summary(self):
+        return (f"Probe: {self.probed} hosts, {self.dead} dead, "
+                f"{self.duplicates} duplicate origins dropped before crawling")
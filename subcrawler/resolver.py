@@ -0,0 +1,124 @@
+import asyncio, random, string, time
+import dns.asyncresolver, dns.resolver, dns.exception
+from .metrics import METRICS
+
+# 네임서버 하나당 초당 요청 수를 제한하는 토큰 버킷
+class RateLimiter:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+def parse_nameservers(nameservers, default_port=53):
+    # "8.8.8.8,127.0.0.1:5353" / ['1.1.1.1'] -> [(host, port), ...]
+    if isinstance(nameservers, str):
+        nameservers = [ns for ns in nameservers.split(',') if ns.strip()]
+    parsed = []
+    for ns in nameservers:
+        ns = ns.strip()
+        if ns.startswith('['):
+            host, _, port = ns[1:].partition(']:')
+        elif ns.count(':') == 1:
+            host, _, port = ns.partition(':')
+        else:
+            host, port = ns, ''
+        parsed.append((host.strip('[]'), int(port) if port else default_port))
+    return parsed
+
+class DnsResolver:
+    def __init__(self, nameservers=None, concurrency=100, rate=50, timeout=2.0):
+        if not nameservers:
+            nameservers = dns.resolver.Resolver().nameservers
+        self.concurrency = int(concurrency)
+        self.resolvers = []
+        for host, port in parse_nameservers(nameservers):
+            resolver = dns.asyncresolver.Resolver(configure=False)
+            resolver.nameservers = [host]
+            resolver.port = port
+            resolver.timeout = resolver.lifetime = float(timeout)
+            self.resolvers.append((resolver, RateLimiter(float(rate))))
+        self._turn = 0
+
+    async def lookup(self, host):
+        # 네임서버를 돌아가며 사용, 각각의 rate limit 적용
+        resolver, limiter = self.resolvers[self._turn % len(self.resolvers)]
+        self._turn += 1
+        for rdtype in ('A', 'AAAA'):
+            await limiter.wait()
+            start = time.perf_counter()
+            try:
+                answer = await resolver.resolve(host, rdtype)
+                METRICS.observe('dns_query_seconds', time.perf_counter() - start, result='answer')
+                return frozenset(rr.to_text() for rr in answer)
+            except dns.resolver.NoAnswer:
+                METRICS.observe('dns_query_seconds', time.perf_counter() - start, result='noanswer')
+                continue
+            except dns.exception.DNSException:
+                METRICS.observe('dns_query_seconds', time.perf_counter() - start, result='error')
+                return frozenset()
+        return frozenset()
+
+    async def wildcard_ips(self, domain, probes=2):
+        # 존재할 리 없는 랜덤 서브도메인이 응답하면 와일드카드 DNS
+        ips = set()
+        for _ in range(probes):
+            label = ''.join(random.choices(string.ascii_lowercase + string.digits, k=16))
+            ips.update(await self.lookup(f"{label}.{domain}"))
+        return frozenset(ips)
+
+    # 해석된 (host, ips)를 나오는 즉시 넘겨준다
+    # hosts는 iterable 또는 async iterator (worker가 비는 대로 하나씩 꺼내므로 미리 다 만들 필요 없음)
+    # resolved(host, found): 질의가 끝날 때마다 호출 (found는 와일드카드가 아닌 응답이 있었는지)
+    async def resolve_iter(self, hosts, domain=None, resolved=None):
+        wildcard = await self.wildcard_ips(domain) if domain else frozenset()
+        if hasattr(hosts, '__aiter__'):
+            hosts = hosts.__aiter__()
+            take = hosts.__anext__
+        else:
+            hosts = iter(hosts)
+
+            async def take():
+                try:
+                    return next(hosts)
+                except StopIteration:
+                    raise StopAsyncIteration from None
+        queue = asyncio.Queue(maxsize=self.concurrency)
+
+        async def worker():
+            try:
+                while True:
+                    try:
+                        host = await take()
+                    except StopAsyncIteration:
+                        break
+                    ips = await self.lookup(host)
+                    found = bool(ips) and not ips <= wildcard
+                    if resolved is not None:
+                        resolved(host, found)
+                    if found:
+                        await queue.put((host, ips))
+            finally:
+                await queue.put(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        try:
+            remaining = len(workers)
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            for task in workers:
+                task.cancel()
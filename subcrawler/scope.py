@@ -0,0 +1,104 @@
+import re, unicodedata
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+# 호스트 이름 정규화와 범위 확인 (enumeration / crtsh / probe / 스파이더 링크 공통)
+# 소문자, 앞뒤 공백과 끝의 '.', 와일드카드 라벨(*.) 제거, 유니코드 이름은 IDNA(punycode)로
+# 라벨에 쓸 수 없는 문자(공백, @ 등)가 있으면 None
+_LABELS = r'[a-z0-9_-]+(?:\.[a-z0-9_-]+)*'
+_HOST = re.compile(r'(?:\*\.)*(' + _LABELS + r')\.?\Z')
+
+# 이미 NFKC 형태인 글자/숫자 라벨은 바로 punycode로 (nameprep이 바꿀 게 없다), 나머지는 표준 IDNA 코덱
+def _idna_label(label):
+    if label.isascii():
+        return label
+    label = label.casefold()
+    if label.isascii():
+        return label
+    if label.replace('-', '').isalnum() and unicodedata.is_normalized('NFKC', label):
+        encoded = 'xn--' + label.encode('punycode').decode('ascii')
+        if len(encoded) > 63:
+            raise UnicodeError('label too long')
+        return encoded
+    return label.encode('idna').decode('ascii')
+
+def _ascii(name):
+    name = name.strip().lower()
+    if not name.isascii():
+        try:
+            name = '.'.join(_idna_label(label) for label in name.split('.'))
+        except UnicodeError:
+            return None
+    return name
+
+def normalize_name(name):
+    name = _ascii(name)
+    match = _HOST.match(name) if name is not None else None
+    return match.group(1) if match else None
+
+# 범위: 루트 도메인들과 그 서브도메인 (evilexample.com은 example.com 범위가 아니다)
+# 루트가 적으면 정규화와 범위 확인을 정규식 하나로 (str.endswith(tuple)),
+# 많으면 라벨 경계마다 set을 찾는다 (batch 모드 등)
+class Scope:
+    def __init__(self, domains):
+        self.roots = frozenset(filter(None, (normalize_name(domain) for domain in domains)))
+        self._suffixes = tuple('.' + root for root in self.roots)
+        self._few = len(self.roots) <= 16
+        self._match = None
+        if self._few and self.roots:
+            alternatives = '|'.join(re.escape(root) for root in sorted(self.roots))
+            self._match = re.compile(r'(?:\*\.)*((?:[a-z0-9_-]+\.)*(?:' + alternatives + r'))\.?\Z').match
+
+    # host는 이미 정규화된 이름
+    def contains(self, host):
+        if host in self.roots:
+            return True
+        if self._few:
+            return host.endswith(self._suffixes)
+        roots = self.roots
+        dot = host.find('.')
+        while dot != -1:
+            if host[dot + 1:] in roots:
+                return True
+            dot = host.find('.', dot + 1)
+        return False
+
+    # 열거 결과 등 날 이름 -> 범위 안이면 정규화된 이름, 아니면 None
+    def normalize(self, name):
+        name = _ascii(name)
+        if name is None:
+            return None
+        if self._match is not None:
+            match = self._match(name)
+            return match.group(1) if match else None
+        match = _HOST.match(name)
+        return match.group(1) if match and self.contains(match.group(1)) else None
+
+    def filter(self, names):
+        normalize = self.normalize
+        for name in names:
+            host = normalize(name)
+            if host is not None:
+                yield host
+
+    # 발견한 링크: http(s) URL의 호스트가 범위 안인지
+    def url_in_scope(self, url):
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            return False
+        if not host:
+            return False
+        host = host.rstrip('.')
+        if not host.isascii():
+            host = normalize_name(host)
+            if host is None:
+                return False
+        return self.contains(host)
+
+@lru_cache(maxsize=256)
+def scope_for(domain):
+    return Scope([domain])
+
+def normalize_host(name, domain):
+    return scope_for(domain).normalize(name)
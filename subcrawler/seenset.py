@@ -0,0 +1,151 @@
+import base64, hashlib, math, sqlite3
+
+# 크롤링 규모와 상관없이 메모리를 거의 일정하게 쓰는 seen-set
+# 모두 `key in seen`, `seen.add(key)`, `len(seen)`를 지원해서 set() 대신 그대로 쓸 수 있다
+#   bloom  : 확장형 Bloom filter, error_rate 확률로 처음 보는 URL을 본 것으로 잘못 판단할 수 있음
+#   sqlite : 디스크 기반 정확한 집합 (키는 16바이트 해시)
+#   memory : 기존 set()
+
+def _key(key):
+    return hashlib.blake2b(key.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+def _hashes(key):
+    digest = _key(key)
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate, count=0, bits=None):
+        self.capacity = int(capacity)
+        self.error_rate = float(error_rate)
+        self.num_bits = max(64, math.ceil(-self.capacity * math.log(self.error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = count
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.num_bits + 7) // 8)
+
+    def contains(self, h1, h2):
+        bits, num_bits = self.bits, self.num_bits
+        for i in range(self.num_hashes):
+            p = (h1 + i * h2) % num_bits
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+    def add(self, h1, h2):
+        bits, num_bits = self.bits, self.num_bits
+        for i in range(self.num_hashes):
+            p = (h1 + i * h2) % num_bits
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def full(self):
+        return self.count >= self.capacity
+
+# 필터가 차면 capacity * growth 크기의 새 필터를 붙인다
+# i번째 필터의 오탐률을 error_rate * (1 - tightening) * tightening^i 로 줄여서 전체 오탐률이 error_rate를 넘지 않게 함
+class ScalableBloomFilter:
+    def __init__(self, capacity=100000, error_rate=0.001, growth=2, tightening=0.5):
+        self.capacity = int(capacity)
+        self.error_rate = float(error_rate)
+        self.growth = growth
+        self.tightening = tightening
+        self.filters = []
+
+    def _add_filter(self):
+        i = len(self.filters)
+        self.filters.append(BloomFilter(self.capacity * self.growth ** i,
+                                        self.error_rate * (1 - self.tightening) * self.tightening ** i))
+
+    def __contains__(self, key):
+        h1, h2 = _hashes(key)
+        return any(f.contains(h1, h2) for f in self.filters)
+
+    def add(self, key):
+        h1, h2 = _hashes(key)
+        if any(f.contains(h1, h2) for f in self.filters):
+            return
+        if not self.filters or self.filters[-1].full():
+            self._add_filter()
+        self.filters[-1].add(h1, h2)
+
+    def __len__(self):
+        return sum(f.count for f in self.filters)
+
+    def nbytes(self):
+        return sum(len(f.bits) for f in self.filters)
+
+    # 체크포인트 저장/복구용 (비트 배열은 base64)
+    def state(self):
+        return {
+            'backend': 'bloom',
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'filters': [[f.capacity, f.error_rate, f.count, base64.b64encode(f.bits).decode()] for f in self.filters],
+        }
+
+    def restore(self, state):
+        if isinstance(state, list):  # 다른 백엔드(set)로 저장된 체크포인트
+            for key in state:
+                self.add(key)
+            return
+        self.capacity = state['capacity']
+        self.error_rate = state['error_rate']
+        # 체크포인트 DB에서 읽은 필터는 bytes 그대로
+        self.filters = [BloomFilter(capacity, error_rate, count, bits if isinstance(bits, bytes) else base64.b64decode(bits))
+                        for capacity, error_rate, count, bits in state['filters']]
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+# 커밋은 commit()(체크포인트 frontier가 커밋된 뒤)과 close()에서만 한다
+# 둘 사이에 강제 종료되면 frontier에 있는 URL의 키가 seen-set에서 빠질 수 있다
+# (그 URL은 다시 받을 수 있지만, 반대 순서처럼 seen으로 처리된 채 frontier에서 사라지지는 않는다)
+class SqliteSeenSet:
+    def __init__(self, path, reset=False):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA synchronous = OFF')
+        self.db.execute('CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY) WITHOUT ROWID')
+        if reset:
+            self.db.execute('DELETE FROM seen')
+        self.db.commit()
+
+    def __contains__(self, key):
+        return self.db.execute('SELECT 1 FROM seen WHERE key = ?', (_key(key),)).fetchone() is not None
+
+    def add(self, key):
+        self.db.execute('INSERT OR IGNORE INTO seen VALUES (?)', (_key(key),))
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def state(self):
+        return {'backend': 'sqlite', 'path': self.path}
+
+    def commit(self):
+        self.db.commit()
+
+    def restore(self, state):
+        if isinstance(state, list):
+            for key in state:
+                self.add(key)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+SEEN_BACKENDS = ('bloom', 'sqlite', 'memory')
+
+# path는 sqlite 백엔드에서만 쓴다. reset=True면 이전 실행에서 남은 키를 지운다 (--resume이 아닐 때)
+def make_seen_set(backend='bloom', path=None, error_rate=0.001, capacity=100000, reset=True):
+    if backend == 'bloom':
+        return ScalableBloomFilter(capacity, error_rate)
+    if backend == 'sqlite':
+        if path is None:
+            raise ValueError("sqlite seen-set needs a path")
+        return SqliteSeenSet(path, reset=reset)
+    if backend == 'memory':
+        return set()
+    raise ValueError(f"Unknown seen-set backend: {backend} (choose from {', '.join(SEEN_BACKENDS)})")
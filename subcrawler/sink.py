@@ -0,0 +1,260 @@
+import json, sqlite3, time
+import lxml.html
+from lxml import etree
+from .metrics import METRICS
+from .plugins import sink
+
+# 페이지 결과를 한 줄씩 JSONL로 기록 (batch_size 단위로 flush)
+class JsonlSink:
+    def __init__(self, path, batch_size=100, append=False, ensure_ascii=False):
+        self.path = path
+        self.batch_size = int(batch_size)
+        self.ensure_ascii = ensure_ascii
+        self.count = 0
+        self._buffer = []
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        if append and _ends_mid_line(path):
+            self._file.write('\n')  # 강제 종료로 잘린 마지막 줄 뒤에 이어 쓰지 않도록
+
+    def write(self, key, record):
+        start = time.perf_counter()
+        self._buffer.append(json.dumps({'key': key, 'record': record}, ensure_ascii=self.ensure_ascii))
+        METRICS.observe('sink_serialize_seconds', time.perf_counter() - start)
+        METRICS.inc('sink_records')
+        self.count += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            with METRICS.timer('sink_flush_seconds'):
+                data = '\n'.join(self._buffer) + '\n'
+                self._file.write(data)
+                self._file.flush()
+            METRICS.inc('sink_written_bytes', len(data))
+            self._buffer.clear()
+
+    # finished=False: 중단된 실행 (--resume으로 이어 쓴다)
+    def close(self, finished=True):
+        self.flush()
+        self._file.close()
+
+def _ends_mid_line(path):
+    with open(path, 'rb') as f:
+        f.seek(0, 2)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, 2)
+        return f.read(1) != b'\n'
+
+def iter_records(jsonl_path):
+    with open(jsonl_path, 'rb') as f:
+        offset = 0
+        for line in f:
+            start, offset = offset, offset + len(line)
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # 중단된 실행의 마지막 줄이 잘려 있을 수 있음
+            yield start, entry['key'], entry['record']
+
+def _dumps(obj, level, ensure_ascii):
+    return json.dumps(obj, indent=2, ensure_ascii=ensure_ascii).replace('\n', '\n' + ' ' * level)
+
+# JSONL -> 기존 <domain>_analysis.json 형식
+# pages_key='pages' 이면 {key: {pages: [...]}}, None 이면 {key: [...]}
+# 메모리에는 key별 오프셋만 유지하고 레코드는 한 건씩 다시 읽는다
+def finalize_json(jsonl_path, json_path, pages_key='pages', ensure_ascii=False):
+    offsets = {}
+    for offset, key, _ in iter_records(jsonl_path):
+        offsets.setdefault(key, []).append(offset)
+
+    indent = 6 if pages_key else 4
+    with open(jsonl_path, 'rb') as src, open(json_path, 'w', encoding='utf-8') as out:
+        out.write('{')
+        for i, (key, key_offsets) in enumerate(offsets.items()):
+            out.write(',\n' if i else '\n')
+            out.write(f"  {json.dumps(key, ensure_ascii=ensure_ascii)}: ")
+            out.write(f'{{\n    "{pages_key}": [' if pages_key else '[')
+            for j, offset in enumerate(key_offsets):
+                src.seek(offset)
+                record = json.loads(src.readline())['record']
+                out.write(',\n' if j else '\n')
+                out.write(' ' * indent + _dumps(record, indent, ensure_ascii))
+            out.write('\n' + ' ' * (indent - 2) + ']')
+            if pages_key:
+                out.write('\n  }')
+        out.write('\n}' if offsets else '}')
+
+# 크롤링이 끝나면 JSONL을 <domain>_analysis.json으로 변환하는 sink (기본)
+class JsonSink(JsonlSink):
+    def __init__(self, path, json_path, pages_key='pages', **kwargs):
+        super().__init__(path, **kwargs)
+        self.json_path = json_path
+        self.pages_key = pages_key
+
+    def close(self, finished=True):
+        super().close(finished)
+        with METRICS.timer('sink_finalize_seconds'):
+            finalize_json(self.path, self.json_path, self.pages_key, self.ensure_ascii)
+
+@sink('json')
+def json_sink(domain, append=False, pages_key='pages'):
+    return JsonSink(f"{domain}_analysis.jsonl", f"{domain}_analysis.json", pages_key, append=append)
+
+@sink('jsonl')
+def jsonl_sink(domain, append=False, pages_key='pages'):
+    return JsonlSink(f"{domain}_analysis.jsonl", append=append)
+
+# 페이지 / input / form / 필드 / 쿠키 / 폼 제출 결과를 정규화한 테이블로 저장하는 sink (<domain>_analysis.sqlite3)
+# JSON 전체를 읽지 않고 SQL로 바로 조회할 수 있다. 실행마다 scans에 한 줄, 같은 파일에 계속 쌓인다
+#   SELECT DISTINCT scan_id, url, action FROM form_inputs WHERE type = 'password'
+# Scrapy 스파이더 형식과 sync/async 엔진 형식(input_tags가 HTML 문자열) 둘 다 받는다
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (id INTEGER PRIMARY KEY, domain TEXT, started REAL, finished REAL);
+CREATE TABLE IF NOT EXISTS hosts (id INTEGER PRIMARY KEY, name TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS pages (id INTEGER PRIMARY KEY, scan_id INTEGER, host_id INTEGER, url TEXT,
+                                  csrf_token TEXT, duplicate_of TEXT);
+CREATE TABLE IF NOT EXISTS inputs (page_id INTEGER, tag TEXT, type TEXT, name TEXT, html_id TEXT, value TEXT);
+CREATE TABLE IF NOT EXISTS forms (id INTEGER PRIMARY KEY, page_id INTEGER, form_key TEXT, action TEXT, method TEXT);
+CREATE TABLE IF NOT EXISTS form_fields (form_id INTEGER, name TEXT, type TEXT, value TEXT);
+CREATE TABLE IF NOT EXISTS cookies (page_id INTEGER, name TEXT, value TEXT);
+CREATE TABLE IF NOT EXISTS form_probes (page_id INTEGER, action TEXT, method TEXT, status INTEGER, response TEXT,
+                                        probed_on TEXT, error TEXT, skipped TEXT);
+CREATE INDEX IF NOT EXISTS pages_scan ON pages (scan_id);
+CREATE INDEX IF NOT EXISTS pages_url ON pages (url);
+CREATE INDEX IF NOT EXISTS inputs_page ON inputs (page_id);
+CREATE INDEX IF NOT EXISTS inputs_type ON inputs (type);
+CREATE INDEX IF NOT EXISTS inputs_name ON inputs (name);
+CREATE INDEX IF NOT EXISTS forms_page ON forms (page_id);
+CREATE INDEX IF NOT EXISTS form_fields_form ON form_fields (form_id);
+CREATE INDEX IF NOT EXISTS form_fields_type ON form_fields (type);
+CREATE INDEX IF NOT EXISTS cookies_name ON cookies (name);
+CREATE VIEW IF NOT EXISTS form_inputs AS
+    SELECT pages.scan_id, hosts.name AS host, pages.url, forms.id AS form_id, forms.form_key, forms.action,
+           forms.method, form_fields.name, form_fields.type, form_fields.value
+    FROM form_fields JOIN forms ON forms.id = form_fields.form_id JOIN pages ON pages.id = forms.page_id
+    JOIN hosts ON hosts.id = pages.host_id;
+"""
+TABLES = {
+    'pages': 'INSERT INTO pages VALUES (?, ?, ?, ?, ?, ?)',
+    'inputs': 'INSERT INTO inputs VALUES (?, ?, ?, ?, ?, ?)',
+    'forms': 'INSERT INTO forms VALUES (?, ?, ?, ?, ?)',
+    'form_fields': 'INSERT INTO form_fields VALUES (?, ?, ?, ?)',
+    'cookies': 'INSERT INTO cookies VALUES (?, ?, ?)',
+    'form_probes': 'INSERT INTO form_probes VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+}
+
+def _input_row(tag):
+    if isinstance(tag, dict):
+        # tag가 없는 예전 레코드는 input/textarea/select를 구분할 수 없다
+        return tag.get('tag'), tag.get('type'), tag.get('name'), tag.get('id'), tag.get('value')
+    try:
+        el = lxml.html.fragment_fromstring(tag)
+    except (etree.ParserError, ValueError):
+        return None, None, None, None, tag
+    default = 'text' if el.tag == 'input' else el.tag
+    return el.tag, el.get('type', default), el.get('name'), el.get('id'), el.get('value')
+
+def _cookie_rows(cookies):
+    if isinstance(cookies, dict):
+        return list(cookies.items())
+    rows = []
+    for cookie in cookies or ():
+        name, _, value = cookie.split(';', 1)[0].partition('=')
+        rows.append((name.strip(), value.strip()))
+    return rows
+
+class SqliteSink:
+    def __init__(self, path, domain=None, batch_size=500, append=False):
+        self.path = path
+        self.batch_size = int(batch_size)
+        self.count = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+        if 'skipped' not in {row[1] for row in self.db.execute('PRAGMA table_info(form_probes)')}:
+            self.db.execute('ALTER TABLE form_probes ADD COLUMN skipped TEXT')  # 이전 버전에서 만든 파일
+        row = self.db.execute('SELECT id FROM scans WHERE domain = ? AND finished IS NULL ORDER BY id DESC LIMIT 1',
+                              (domain,)).fetchone() if append else None
+        # --resume이면 끝나지 않은 마지막 scan에 이어서 쓴다
+        if row:
+            self.scan_id = row[0]
+        else:
+            self.scan_id = self.db.execute('INSERT INTO scans (domain, started) VALUES (?, ?)',
+                                           (domain, time.time())).lastrowid
+        self.db.commit()
+        self._hosts = dict(self.db.execute('SELECT name, id FROM hosts'))
+        self._page_id = self.db.execute('SELECT coalesce(max(id), 0) FROM pages').fetchone()[0]
+        self._form_id = self.db.execute('SELECT coalesce(max(id), 0) FROM forms').fetchone()[0]
+        self._rows = {table: [] for table in TABLES}
+        self._pending = 0
+
+    def _host(self, name):
+        host_id = self._hosts.get(name)
+        if host_id is None:
+            host_id = self._hosts[name] = self.db.execute('INSERT INTO hosts (name) VALUES (?)', (name,)).lastrowid
+        return host_id
+
+    def write(self, key, record):
+        start = time.perf_counter()
+        self._page_id += 1
+        page_id = self._page_id
+        rows = self._rows
+        rows['pages'].append((page_id, self.scan_id, self._host(key), record.get('url'), record.get('csrf_token'),
+                              record.get('duplicate_of')))
+        types = {}
+        for tag in record.get('input_tags') or ():
+            row = _input_row(tag)
+            rows['inputs'].append((page_id,) + row)
+            if row[2]:
+                types.setdefault(row[2], row[1])
+        form_data = record.get('form_data') or {}
+        if all(isinstance(form, dict) and 'inputs' in form for form in form_data.values()):
+            forms = [(form_key, form['action'], form['method'], [(i['name'], i['value']) for i in form['inputs']])
+                     for form_key, form in form_data.items()]
+        else:
+            # sync/async 형식: 폼 단위 정보는 폼 제출 결과에만 있다
+            forms = [(None, probe['action'], probe['method'], [(name, form_data.get(name)) for name in probe['fields']])
+                     for probe in record.get('form_probes') or ()]
+        for form_key, action, method, fields in forms:
+            self._form_id += 1
+            rows['forms'].append((self._form_id, page_id, form_key, action, method))
+            rows['form_fields'].extend((self._form_id, name, types.get(name), value) for name, value in fields)
+        rows['cookies'].extend((page_id, name, value) for name, value in _cookie_rows(record.get('cookies')))
+        for probe in record.get('form_probes') or ():
+            rows['form_probes'].append((page_id, probe['action'], probe['method'], probe.get('status'),
+                                        probe.get('response'), probe.get('probed_on'), probe.get('error'),
+                                        probe.get('skipped')))
+        METRICS.observe('sink_serialize_seconds', time.perf_counter() - start)
+        METRICS.inc('sink_records')
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with METRICS.timer('sink_flush_seconds'):
+            for table, rows in self._rows.items():
+                if rows:
+                    self.db.executemany(TABLES[table], rows)
+                    rows.clear()
+            self.db.commit()
+        self._pending = 0
+
+    # --resume: 이번 scan에서 이미 저장된 URL
+    def finished_urls(self):
+        self.flush()
+        return {url for url, in self.db.execute('SELECT url FROM pages WHERE scan_id = ?', (self.scan_id,))}
+
+    # 중단된 scan은 finished를 비워 두어야 --resume이 같은 scan_id에 이어 쓴다
+    def close(self, finished=True):
+        self.flush()
+        if finished:
+            self.db.execute('UPDATE scans SET finished = ? WHERE id = ?', (time.time(), self.scan_id))
+            self.db.commit()
+        self.db.close()
+
+@sink('sqlite')
+def sqlite_sink(domain, append=False, pages_key='pages'):
+    return SqliteSink(f"{domain}_analysis.sqlite3", domain, append=append)
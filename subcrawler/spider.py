@@ -0,0 +1,358 @@
+import scrapy
+from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
+from scrapy import signals
+from scrapy.crawler import CrawlerProcess
+from scrapy.exceptions import DontCloseSpider, StopDownload
+from scrapy.http import TextResponse
+from scrapy.linkextractors import LinkExtractor
+from twisted.internet import reactor
+from .plugins import engine, batch_engine, SINKS
+from .extract import extract_page_data
+from .dedup import Deduper
+from .seenset import make_seen_set
+from .checkpoint import CrawlCheckpoint, finished_urls
+from .enum_cache import EnumCache
+from .incremental import RescanIndex
+from .scope import scope_for
+from .limits import BodyLimit, MAX_BYTES
+from .enumeration import enumerate_in_thread, EnumerationLoop
+from .batch import SharedPools, budget
+from .metrics import METRICS
+
+def _flag(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+def _names(value):
+    return tuple(value.split(',')) if isinstance(value, str) else tuple(value)
+
+def _header(response, name):
+    value = response.headers.get(name)
+    return value.decode('latin-1') if value else None
+
+# amas / crtns / only_crt가 하던 일을 하나로 합친 spider
+# sources: 열거에 쓸 enumerator 이름, schemes: probe 없이 크롤링할 scheme
+# 예: scrapy runspider subcrawler/spider.py -a domain=example.com -a sources=crtsh,wordlist
+class DomainSpider(scrapy.Spider):
+    name = "domain_spider"
+
+    def __init__(self, domain=None, max_depth=3, sources=('amass', 'crtsh'), source_options=None,
+                 schemes=('http', 'https'), probe=True, refresh=False, cache_ttl=86400, resume=False,
+                 checkpoint_interval=30, seen_backend='bloom', seen_error_rate=0.001, sink='json', output=None,
+                 cache=None, enum_loop=None, probe_options=None, incremental=False, max_bytes=MAX_BYTES,
+                 all_types=False, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.domain = domain
+        self.max_depth = int(max_depth)
+        self.sources = _names(sources)
+        self.source_options = source_options or {}
+        self.schemes = _names(schemes)
+        self.output = output or domain  # 결과/체크포인트/seen-set 파일 이름 (분산 모드에서는 shard마다 다르게)
+        self.subdomains = set()
+        self.refresh = _flag(refresh)
+        self.probe = _flag(probe)  # https/http를 먼저 HEAD로 확인하고 살아 있는 origin만 크롤링
+        self.probe_options = probe_options or {}
+        # batch 모드에서는 열거 캐시와 열거 이벤트 루프(공유 DNS/probe 풀)를 도메인끼리 같이 쓴다
+        self.cache = cache or EnumCache(ttl=cache_ttl)
+        self.enum_loop = enum_loop
+        self.enumeration = None
+        self.enumerating = True
+        # 발견한 링크 중 domain과 그 서브도메인만 따라간다 (이미지, 문서 등 확장자는 제외)
+        self.scope = scope_for(domain)
+        self.link_extractor = LinkExtractor()
+        # HTML이 아닌 응답은 헤더에서 끊고, 큰 페이지는 max_bytes까지만 받는다 (0이면 제한 없음)
+        self.limit = BodyLimit(int(max_bytes), html_only=not _flag(all_types))
+        self.downloads = WeakKeyDictionary()  # request -> [Content-Length, 받은 바이트]
+        self.checkpoint = CrawlCheckpoint(f"{self.output}.checkpoint.sqlite3", checkpoint_interval, meta_keys=('subdomain', 'depth'))
+        self.resume = _flag(resume) and self.checkpoint.exists()
+        self.checkpoint.open(reset=not self.resume)
+        # seen-URL set: bloom(기본, 오탐률 seen_error_rate) / sqlite(<domain>.seen.sqlite3, 정확) / memory
+        # 본문 fingerprint는 메모리 대신 체크포인트 DB에 (크롤링이 커져도 늘지 않고 저장할 때 다시 쓰지 않는다)
+        self.dedup = Deduper(make_seen_set(seen_backend, f"{self.output}.seen.sqlite3", float(seen_error_rate), reset=not self.resume),
+                             pages=self.checkpoint.pages)
+        self.sink = SINKS[sink](self.output, append=self.resume)
+        if self.resume:
+            # 마지막 체크포인트부터 이어서: 남은 요청, seen-set, 서브도메인 복구
+            finished = self.sink.finished_urls() if hasattr(self.sink, 'finished_urls') else finished_urls(self.sink.path)
+            state = self.checkpoint.load(finished=finished)
+            if state is not None:
+                self.subdomains = set(state['subdomains'])
+                self.enumerating = state['enumerating']
+                self.dedup.restore(state['dedup'], self.checkpoint)
+        # 지난 스캔 결과와 비교해서 바뀐 페이지만 받는다 (304는 parse까지 넘어오게)
+        self.rescan = None
+        if _flag(incremental):
+            self.rescan = RescanIndex(self.output, self.resume, json_diff=hasattr(self.sink, 'json_path'))
+            self.handle_httpstatus_list = [304]
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(spider.headers_received, signal=signals.headers_received)
+        if spider.limit.max_bytes:
+            crawler.signals.connect(spider.bytes_received, signal=signals.bytes_received)
+        spider.checkpoint.connect(crawler, spider.save_checkpoint)
+        # /metrics를 읽을 때마다 현재 값을 가져간다
+        METRICS.set('scheduler_queue_depth', lambda: len(crawler.engine.slot.scheduler))
+        METRICS.set('downloader_active_requests', lambda: len(crawler.engine.downloader.active))
+        return spider
+
+    def save_checkpoint(self):
+        self.sink.flush()
+        if self.rescan is not None:
+            self.rescan.flush()
+        self.checkpoint.save({
+            'subdomains': list(self.subdomains),
+            'enumerating': self.enumerating,
+            'dedup': self.dedup.state(self.checkpoint),
+        })
+        self.dedup.commit()
+
+    def start_requests(self):
+        if self.resume:
+            self.logger.info(f"Resuming {self.checkpoint.pending()} pending requests from {self.checkpoint.path}")
+            for url, meta in self.checkpoint.frontier():
+                yield self.request(url, meta)
+            if not self.enumerating:
+                return
+
+        self.enumerating = True
+        self.start_enumeration()
+
+    # 모든 enumerator를 동시에 돌리고, 찾는 즉시 크롤링 큐에 넣는다 (메인 도메인은 항상 포함)
+    def start_enumeration(self):
+        self.enumeration = enumerate_in_thread(
+            self.domain,
+            on_host=lambda *host: reactor.callFromThread(self.add_subdomain, *host),
+            on_done=lambda: reactor.callFromThread(self.enumeration_finished),
+            sources=self.sources, options=self.source_options, include=(self.domain,),
+            probe=dict(self.probe_options) if self.probe else None, cache=self.cache, refresh=self.refresh,
+            log=self.logger, loop=self.enum_loop
+        )
+
+    def subdomain_requests(self, subdomain, origin=None):
+        self.subdomains.add(subdomain)
+        urls = [origin] if origin else [f'{scheme}://{subdomain}' for scheme in self.schemes]
+        for url in urls:
+            self.dedup.seen_url(url)
+        return [self.request(url, {'subdomain': subdomain, 'depth': 0}) for url in urls]
+
+    # URL 중복은 self.dedup(seen-set 백엔드)에서 거르므로 Scrapy dupefilter는 건너뛴다 (dont_filter)
+    def request(self, url, meta):
+        headers = self.rescan.headers(url) if self.rescan is not None else None
+        return scrapy.Request(url, callback=self.parse, errback=self.error, meta=meta, headers=headers,
+                              dont_filter=True)
+
+    def add_subdomain(self, subdomain, origin=None):
+        if subdomain not in self.subdomains:
+            for request in self.subdomain_requests(subdomain, origin):
+                self.crawler.engine.crawl(request)
+
+    def enumeration_finished(self):
+        self.enumerating = False
+        self.logger.info(f"Found {len(self.subdomains)} subdomains")
+
+    def spider_idle(self):
+        if self.enumerating:
+            raise DontCloseSpider
+
+    # StopDownload(fail=False): 그때까지 받은 본문(비어 있음)으로 parse가 불린다 (HTML이 아니면 parse에서 건너뜀)
+    def headers_received(self, headers, body_length, request, spider):
+        content_type = headers.get(b'Content-Type')
+        if self.limit.skip_type(content_type.decode('latin-1') if content_type else None):
+            self.limit.avoided(request.url, 'content_type', body_length)
+            raise StopDownload(fail=False)
+        self.downloads[request] = [body_length, 0]
+
+    def bytes_received(self, data, request, spider):
+        download = self.downloads.get(request)
+        if download is None:
+            return
+        download[1] += len(data)
+        if self.limit.too_big(download[1]):
+            self.limit.avoided(request.url, 'max_bytes', download[0], download[1])
+            del self.downloads[request]
+            raise StopDownload(fail=False)
+
+    def parse(self, response):
+        self.checkpoint.complete(response.request)
+        METRICS.observe('fetch_seconds', response.meta.get('download_latency', 0.0), engine='scrapy')
+        METRICS.inc('responses', status=response.status)
+        METRICS.inc('response_bytes', len(response.body))
+        if self.limit.skip_type(_header(response, 'Content-Type')):
+            # 헤더에서 끊은 JSON, CSS 등도 TextResponse라서 여기서 걸러야 빈 본문이 저장/중복 판정되지 않는다
+            return
+        subdomain = response.meta['subdomain']
+        current_depth = response.meta['depth']
+        if self.rescan is not None:
+            if response.status == 304:
+                stored = self.rescan.not_modified(response.url)
+            elif isinstance(response, TextResponse):
+                stored = self.rescan.unchanged(response.url, response.body, _header(response, 'ETag'),
+                                               _header(response, 'Last-Modified'))
+            else:
+                stored = None
+            if stored is not None:
+                # 지난 스캔과 같은 페이지: 저장된 결과를 그대로 쓰고 저장된 링크를 따라간다
+                key, record, links = stored
+                self.sink.write(key, record)
+                yield from self.follow_links(links, subdomain, current_depth)
+                return
+        if response.status == 304 or not isinstance(response, TextResponse):
+            return  # 이미지, 압축 파일 등은 분석할 것이 없다
+        current_domain = urlparse(response.url).netloc
+
+        duplicate_of = self.dedup.duplicate_of(response.url, response.body)
+        if duplicate_of:
+            # 본문이 같은 페이지(CDN 별칭, http/https 등)는 다시 분석하지 않고 링크도 따라가지 않는다
+            record = {'url': response.url, 'duplicate_of': duplicate_of}
+            self.sink.write(current_domain, record)
+            self.remember(response, current_domain, record, ())
+            return
+
+        with METRICS.timer('extract_seconds'):
+            page_data = extract_page_data(response)
+        self.sink.write(current_domain, page_data)
+
+        links = ()
+        # 다음 스캔에서 304를 받았을 때 따라갈 수 있도록 --incremental이면 마지막 깊이에서도 링크를 남긴다
+        if current_depth < self.max_depth or self.rescan is not None:
+            with METRICS.timer('link_extract_seconds'):
+                links = [link.url for link in self.link_extractor.extract_links(response)
+                         if self.scope.url_in_scope(link.url)]
+        self.remember(response, current_domain, page_data, links)
+        yield from self.follow_links(links, subdomain, current_depth)
+
+    def remember(self, response, key, record, links):
+        if self.rescan is not None:
+            self.rescan.store(response.url, key, response.body, record, links, _header(response, 'ETag'),
+                              _header(response, 'Last-Modified'))
+
+    def follow_links(self, links, subdomain, depth):
+        if depth < self.max_depth:
+            for url in links:
+                request = self.follow(url, subdomain, depth + 1)
+                if request is not None:
+                    yield request
+
+    def follow(self, url, subdomain, depth):
+        if self.dedup.seen_url(url):
+            return None
+        return self.request(url, {'subdomain': subdomain, 'depth': depth})
+
+    def closed(self, reason):
+        self.logger.info(f"Spider closed: {reason}")
+        self.logger.info(self.dedup.summary())
+        self.logger.info(self.limit.summary())
+        self.checkpoint.stop()
+        if self.enum_loop is not None and self.enumeration is not None:
+            self.enumeration.cancel()  # 공유 루프에서 아직 돌고 있는 이 도메인의 열거
+        if reason == 'finished':
+            self.checkpoint.remove()
+        else:
+            self.save_checkpoint()
+            self.checkpoint.close()
+            self.logger.info(f"Crawl state saved to {self.checkpoint.path}, continue with --resume")
+        self.dedup.close()
+        self.sink.close(finished=reason == 'finished')
+        self.logger.info(f"Results saved to {getattr(self.sink, 'json_path', self.sink.path)}")
+        if self.rescan is not None:
+            self.rescan.close(finished=reason == 'finished')
+            self.logger.info(self.rescan.summary())
+            if not self.rescan.baseline:
+                self.logger.info(f"Changes saved to {getattr(self.rescan.diff, 'json_path', self.rescan.diff.path)}")
+
+    def error(self, failure):
+        self.checkpoint.complete(failure.request)
+        METRICS.inc('fetch_errors', error=failure.type.__name__)
+        self.logger.error(f"Error on {failure.request.url}: {str(failure.value)}")
+
+# Scrapy 설정
+SETTINGS = {
+    'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'LOG_LEVEL': 'INFO',
+    'CONCURRENT_REQUESTS': 32,  # 전체 상한
+    # 호스트별 동시 요청 수/딜레이는 이 값에서 시작해 HostThrottle이 응답 지연, 에러, Retry-After를 보고 조절
+    'CONCURRENT_REQUESTS_PER_DOMAIN': 2,
+    'DOWNLOAD_DELAY': 0.5,
+    'DOWNLOADER_MIDDLEWARES': {'subcrawler.throttle.HostThrottle': 560},
+    'HOST_THROTTLE_MAX_CONCURRENCY': 8,
+    'SCHEDULER_PRIORITY_QUEUE': 'scrapy.pqueues.DownloaderAwarePriorityQueue',
+    # 너비 우선: 깊은 경로로 먼저 만난 페이지가 seen 처리되어 얕은 경로의 하위 링크가 depth 제한에 걸리지 않도록
+    'DEPTH_PRIORITY': 1,
+    'SCHEDULER_DISK_QUEUE': 'scrapy.squeues.PickleFifoDiskQueue',
+    'SCHEDULER_MEMORY_QUEUE': 'scrapy.squeues.FifoMemoryQueue',
+    'RETRY_TIMES': 3,
+    'RETRY_HTTP_CODES': [500, 502, 503, 504, 522, 524, 408, 429],
+}
+
+@engine('scrapy')
+def run_scrapy(domain, options, settings=None, spidercls=DomainSpider, **kwargs):
+    merged = dict(SETTINGS)
+    merged.update(options['settings'])
+    merged.update(settings or {})
+    process = CrawlerProcess(merged)
+    kwargs.setdefault('sink', options['sink'])
+    kwargs.setdefault('probe_options', {'concurrency': options['concurrency'], 'timeout': options['timeout']})
+    process.crawl(spidercls, domain=domain, max_depth=options['max_depth'], sources=options['sources'],
+                  source_options=options['source_options'], schemes=options['schemes'], probe=options['probe'],
+                  refresh=options['refresh'], resume=options['resume'], seen_backend=options['seen'],
+                  incremental=options['incremental'], max_bytes=options['max_bytes'],
+                  all_types=options['all_types'], **kwargs)
+    process.start()
+
+# --targets: 한 프로세스, 한 reactor에서 도메인마다 DomainSpider를 돌린다
+# 동시에 도는 spider는 G // P개이고 각자 CONCURRENT_REQUESTS=P, 하나가 끝나면 다음 도메인을 시작
+# Scrapy DNS 캐시와 reactor 스레드풀, 열거 캐시, 열거 루프(DNS resolver, probe 연결 풀)는 공유
+# 결과/체크포인트/seen-set 파일은 도메인마다 따로
+@batch_engine('scrapy')
+def run_scrapy_batch(domains, options, progress):
+    parallel, per_domain = budget(options, domains)
+    merged = dict(SETTINGS, CONCURRENT_REQUESTS=per_domain,
+                  CONCURRENT_REQUESTS_PER_DOMAIN=min(SETTINGS['CONCURRENT_REQUESTS_PER_DOMAIN'], per_domain))
+    merged.update(options['settings'])
+    process = CrawlerProcess(merged)
+    enum_loop = EnumerationLoop()
+    pools = enum_loop.call(SharedPools, options)
+    cache = EnumCache()
+    pending = iter(domains)
+    stopping = []
+
+    def closed(spider, reason):
+        progress.finish(spider.domain, reason)
+        if reason == 'shutdown':
+            stopping.append(spider.domain)  # Ctrl-C: 남은 도메인은 시작하지 않는다
+
+    def failed(failure, domain):
+        # spider를 만들다가 실패한 경우 (spider_closed가 오지 않는다)
+        print(f"[batch] {domain}: {failure.getErrorMessage()}")
+        if domain in progress.started:
+            progress.finish(domain, 'failed')
+
+    def next_domain(_=None):
+        domain = None if stopping else next(pending, None)
+        if domain is None:
+            return
+        crawler = process.create_crawler(DomainSpider)
+        crawler.signals.connect(closed, signal=signals.spider_closed)
+        progress.start(domain)
+        deferred = process.crawl(crawler, domain=domain, max_depth=options['max_depth'], sources=options['sources'],
+                                 source_options=pools.source_options, schemes=options['schemes'],
+                                 probe=options['probe'], refresh=options['refresh'], resume=options['resume'],
+                                 seen_backend=options['seen'], sink=options['sink'], incremental=options['incremental'],
+                                 max_bytes=options['max_bytes'], all_types=options['all_types'], cache=cache,
+                                 enum_loop=enum_loop.loop,
+                                 probe_options={'connector': pools.probe_connector,
+                                                'concurrency': options['concurrency'], 'timeout': options['timeout']})
+        deferred.addErrback(failed, domain)
+        deferred.addBoth(next_domain)
+
+    for _ in range(parallel):
+        next_domain()
+    try:
+        process.start()
+    finally:
+        enum_loop.run(pools.close())
+        enum_loop.close()
+        cache.close()
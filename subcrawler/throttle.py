@@ -0,0 +1,158 @@
+import time
+from email.utils import parsedate_to_datetime
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet.error import ConnectionLost, TCPTimedOutError, TimeoutError
+from twisted.web.client import ResponseNeverReceived
+
+# 호스트(다운로드 슬롯)별로 동시 요청 수와 딜레이를 따로 조절하는 다운로더 미들웨어
+#   - 정상 응답이 이어지고 지연이 늘지 않으면 동시 요청 수를 1씩 올리고 딜레이는 줄인다
+#   - 429/503/타임아웃이면 동시 요청 수를 반으로, 딜레이는 두 배로 (Retry-After가 있으면 그만큼 쉰다)
+#   - 전체 상한은 Scrapy의 CONCURRENT_REQUESTS 그대로
+# 시작값은 CONCURRENT_REQUESTS_PER_DOMAIN / DOWNLOAD_DELAY
+# settings:
+#   HOST_THROTTLE_ENABLED         = True
+#   HOST_THROTTLE_MAX_CONCURRENCY = 16   (호스트당 최대 동시 요청)
+#   HOST_THROTTLE_MIN_DELAY       = 0.0
+#   HOST_THROTTLE_MAX_DELAY       = 60.0 (Retry-After도 이 값으로 자른다)
+#   HOST_THROTTLE_BACKOFF_CODES   = [429, 503]
+BACKOFF_CODES = [429, 503]
+# 서버가 밀려서 생기는 에러만 (DNS 실패 등은 호스트 부하와 관계없음)
+BACKOFF_EXCEPTIONS = (TimeoutError, TCPTimedOutError, ConnectionLost, ResponseNeverReceived)
+
+class HostState:
+    __slots__ = ('concurrency', 'delay', 'latency', 'min_latency', 'error_rate', 'successes',
+                 'hold_until', 'last_backoff', 'responses', 'backoffs')
+
+    def __init__(self, concurrency, delay):
+        self.concurrency = concurrency
+        self.delay = delay
+        self.latency = None  # EWMA
+        self.min_latency = None
+        self.error_rate = 0.0  # EWMA
+        self.successes = 0
+        self.hold_until = 0.0
+        self.last_backoff = 0.0
+        self.responses = 0
+        self.backoffs = 0
+
+def retry_after_seconds(value, now=None):
+    if not value:
+        return None
+    value = value.decode('latin-1') if isinstance(value, bytes) else value
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - (now or time.time()))
+    except (TypeError, ValueError, IndexError):
+        return None
+
+class HostThrottle:
+    ALPHA = 0.3  # EWMA 가중치
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        if not settings.getbool('HOST_THROTTLE_ENABLED', True):
+            raise NotConfigured
+        self.crawler = crawler
+        self.start_concurrency = settings.getint('CONCURRENT_REQUESTS_PER_DOMAIN')
+        self.start_delay = settings.getfloat('DOWNLOAD_DELAY')
+        self.max_concurrency = max(self.start_concurrency, settings.getint('HOST_THROTTLE_MAX_CONCURRENCY', 16))
+        self.min_delay = settings.getfloat('HOST_THROTTLE_MIN_DELAY', 0.0)
+        self.max_delay = settings.getfloat('HOST_THROTTLE_MAX_DELAY', 60.0)
+        self.backoff_codes = {int(code) for code in settings.getlist('HOST_THROTTLE_BACKOFF_CODES', BACKOFF_CODES)}
+        self.randomize_delay = settings.getbool('RANDOMIZE_DOWNLOAD_DELAY')
+        self.hosts = {}
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_response(self, request, response, spider):
+        key = request.meta.get('download_slot')
+        if key is not None:
+            if response.status in self.backoff_codes:
+                self.backoff(key, retry_after_seconds(response.headers.get('Retry-After')))
+            else:
+                self.success(key, request.meta.get('download_latency'), failed=response.status >= 500)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        key = request.meta.get('download_slot')
+        if key is not None and isinstance(exception, BACKOFF_EXCEPTIONS):
+            self.backoff(key)
+
+    def state(self, key):
+        if key not in self.hosts:
+            self.hosts[key] = HostState(self.start_concurrency, self.start_delay)
+        return self.hosts[key]
+
+    def success(self, key, latency, failed=False):
+        host = self.state(key)
+        host.responses += 1
+        host.error_rate += self.ALPHA * ((1.0 if failed else 0.0) - host.error_rate)
+        if latency is not None and not failed:
+            host.latency = latency if host.latency is None else host.latency + self.ALPHA * (latency - host.latency)
+            host.min_latency = latency if host.min_latency is None else min(host.min_latency, latency)
+        if failed or time.time() < host.hold_until:
+            self.apply(key, host)
+            return
+
+        # 한 번이라도 제한에 걸린 호스트는 딜레이를 천천히 줄인다 (바로 다시 429를 받지 않도록)
+        host.delay *= 0.9 if host.backoffs else 0.5
+        host.delay = max(self.min_delay, host.delay if host.delay > 0.01 else 0.0)
+        # 동시 요청 수만큼 연속으로 성공하면 한 단계씩 조절 (지연이 최소치의 2배를 넘으면 서버가 밀리는 것으로 봄)
+        host.successes += 1
+        if host.successes >= host.concurrency:
+            host.successes = 0
+            congested = host.latency is not None and host.latency > 2 * host.min_latency + 0.05
+            if congested:
+                host.concurrency = max(1, host.concurrency - 1)
+            elif host.error_rate < 0.1:
+                host.concurrency = min(self.max_concurrency, host.concurrency + 1)
+        self.apply(key, host)
+
+    def backoff(self, key, retry_after=None):
+        host = self.state(key)
+        host.responses += 1
+        host.backoffs += 1
+        host.error_rate += self.ALPHA * (1.0 - host.error_rate)
+        host.successes = 0
+        now = time.time()
+        # 동시에 보낸 요청들이 한꺼번에 429를 받은 경우는 한 번만 줄인다
+        if now - host.last_backoff >= host.delay:
+            host.concurrency = max(1, host.concurrency // 2)
+            host.delay = min(self.max_delay, max(host.delay * 2, self.start_delay, 0.5))
+        host.last_backoff = now
+        if retry_after is not None:
+            host.delay = max(host.delay, min(self.max_delay, retry_after))
+            host.hold_until = max(host.hold_until, now + min(self.max_delay, retry_after))
+        self.crawler.stats.inc_value('host_throttle/backoff')
+        self.apply(key, host)
+
+    # 살아 있는 슬롯과, 유휴 슬롯이 정리된 뒤 새로 만들어질 때 쓰는 per_slot_settings 둘 다 갱신
+    def apply(self, key, host):
+        holding = time.time() < host.hold_until
+        downloader = self.crawler.engine.downloader
+        downloader.per_slot_settings[key] = {
+            'concurrency': host.concurrency,
+            'delay': host.delay,
+            'randomize_delay': self.randomize_delay and not holding,
+        }
+        slot = downloader.slots.get(key)
+        if slot is not None:
+            slot.concurrency = host.concurrency
+            slot.delay = host.delay
+            slot.randomize_delay = self.randomize_delay and not holding
+
+    def spider_closed(self, spider):
+        throttled = sorted(((key, host) for key, host in self.hosts.items() if host.backoffs),
+                           key=lambda item: item[1].backoffs, reverse=True)
+        for key, host in throttled[:20]:
+            spider.logger.info(f"Throttled {key}: {host.backoffs}/{host.responses} backoffs, "
+                               f"concurrency {host.concurrency}, delay {host.delay:.2f}s")
+        stats = self.crawler.stats
+        stats.set_value('host_throttle/hosts', len(self.hosts))
+        stats.set_value('host_throttle/throttled_hosts', len(throttled))